@@ -12,6 +12,7 @@ from datetime import datetime
 
 # Import your existing database manager
 from database_manager import DatabaseManager
+from utils.text.text_processor import get_transcription_status
 
 # Import your existing analysis system components
 # Update this path if needed to import from your original script
@@ -145,8 +146,8 @@ class DbCallAnalysisService:
         valid_items = []
         
         for item in transcriptions:
-            # Skip invalid or empty transcriptions
-            if not item.get('transcription') or not isinstance(item['transcription'], str) or str(item['transcription']).startswith("ERROR:"):
+            # Skip failed and empty transcriptions
+            if get_transcription_status(item) != "ok":
                 continue
             
             text = item['transcription']
@@ -53,7 +53,8 @@ class ElevenLabsClient:
     
     def transcribe_audio(self, audio_data: bytes, 
                          language_code: str = "en", 
-                         model_id: str = "scribe_v1") -> Dict[str, Any]:
+                         model_id: str = "scribe_v1",
+                         file_name: str = "audio.aac") -> Dict[str, Any]:
         """
         Transcribe audio to text
         
@@ -61,6 +62,7 @@ class ElevenLabsClient:
             audio_data: Binary audio data
             language_code: Language code for transcription
             model_id: Model ID to use for transcription
+            file_name: Upload file name; its extension tells the API the container format
             
         Returns:
             Transcription results dictionary
@@ -69,7 +71,7 @@ class ElevenLabsClient:
         
         try:
             files = {
-                "file": ("audio.aac", audio_data)
+                "file": (file_name, audio_data)
             }
             
             data = {
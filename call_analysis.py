@@ -18,6 +18,8 @@ from dotenv import load_dotenv
 from dataclasses import dataclass, field, asdict
 from functools import lru_cache
 
+from utils.text.text_processor import get_transcription_status
+
 # ------------------------------
 # Configuration
 # ------------------------------
@@ -184,7 +186,7 @@ class TextProcessor:
                     break
         
         except Exception as e:
-            logger.error(f"Error extracting date from filename {file_name}: {str(e)}")
+            logger.error("Error extracting date from filename %s: %s", file_name, e)
         
         return call_date
 
@@ -869,8 +871,8 @@ class CallAnalysisService:
         valid_items = []
         
         for item in transcriptions:
-            # Skip invalid or empty transcriptions
-            if not item.get('transcription') or not isinstance(item['transcription'], str) or item['transcription'].startswith("ERROR:"):
+            # Skip failed and empty transcriptions
+            if get_transcription_status(item) != "ok":
                 continue
             
             text = item['transcription']
@@ -958,8 +960,8 @@ class CallAnalysisService:
         transcriptions_to_analyze = []
         
         for _, row in transcriptions_df.iterrows():
-            # Skip invalid transcriptions
-            if not isinstance(row['transcription'], str) or not row['transcription'].strip() or row['transcription'].startswith("ERROR:"):
+            # Skip failed and empty transcriptions
+            if get_transcription_status(row) != "ok":
                 continue
             
             file_name = row['file_name']
@@ -39,7 +39,9 @@ class ConfigManager:
             "batch_size": 10,
             "openai_model": "gpt-4-turbo",
             "max_retries": 3,
-            "rate_limit_rpm": 10
+            "rate_limit_rpm": 10,
+            "transcode_uploads": True,
+            "min_transcode_bytes": 256 * 1024
         }
         
         # Load from file if specified
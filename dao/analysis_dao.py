@@ -12,6 +12,8 @@ import os
 import csv
 from datetime import datetime
 
+from dao.base_dao import null_if_blank
+
 logger = logging.getLogger(__name__)
 
 class AnalysisResultDAO:
@@ -376,6 +378,9 @@ class AnalysisResultDAO:
                             error_count += 1
                             continue
                         
+                        # Store unset fields (e.g. confidence_score) as NULL rather than ''
+                        row = {key: null_if_blank(value) for key, value in row.items()}
+                        
                         # Save the analysis result
                         if self.save(row):
                             success_count += 1
@@ -386,6 +391,10 @@ class AnalysisResultDAO:
                         logger.error(f"Error importing row: {str(e)}")
                         error_count += 1
             
+            # Refresh planner statistics after a bulk load
+            if success_count:
+                self.analyze()
+            
             return (success_count, error_count)
             
         except Exception as e:
@@ -395,6 +404,29 @@ class AnalysisResultDAO:
             if conn:
                 conn.close()
     
+    def analyze(self) -> bool:
+        """
+        Refresh query planner statistics for the analysis results table
+        
+        Call after inserting a large batch so SQLite picks the right indexes.
+        
+        Returns:
+            Success flag
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            conn.execute(f"ANALYZE {self.TABLE_NAME}")
+            conn.commit()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error analyzing {self.TABLE_NAME}: {str(e)}")
+            return False
+        finally:
+            if conn:
+                conn.close()
+    
     def export_to_csv(self, csv_file: str, completed_only: bool = False) -> bool:
         """
         Export analysis results to a CSV file
@@ -11,10 +11,26 @@ from contextlib import contextmanager
 
 # Import the error handler for standardized error handling
 from utils.error.error_handler import DatabaseError, exception_mapper
+from dao.db_connection_pool import get_connection_pool
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def null_if_blank(value: Any) -> Any:
+    """
+    Map an empty CSV cell to None
+    
+    csv readers yield '' for empty cells, which STRICT tables reject in
+    INTEGER and REAL columns; NULL is accepted by every nullable column.
+    
+    Args:
+        value: Cell value
+        
+    Returns:
+        None for an empty string, otherwise the value unchanged
+    """
+    return None if value == '' else value
+
 class BaseDAO:
     """Base class for all Data Access Objects"""
     
@@ -26,6 +42,8 @@ class BaseDAO:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        # Shared by every DAO on the same database
+        self._pool = get_connection_pool(db_path)
     
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
@@ -33,27 +51,17 @@ class BaseDAO:
         Context manager for database connections
         
         Yields:
-            A configured SQLite connection
+            A configured SQLite connection from the shared pool
         
         Raises:
             DatabaseError: If a database error occurs
         """
-        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            # Enable foreign keys
-            conn.execute("PRAGMA foreign_keys = ON")
-            # Return dictionary-like rows
-            conn.row_factory = sqlite3.Row
-            yield conn
+            with self._pool.acquire() as conn:
+                yield conn
         except sqlite3.Error as e:
             logger.error(f"Database connection error: {str(e)}")
-            if conn:
-                conn.rollback()
             raise DatabaseError(f"Database connection error: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
     
     @exception_mapper({sqlite3.Error: DatabaseError})
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
@@ -6,7 +6,7 @@ Provides database operations for categories and valid combinations.
 
 import os
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 import pandas as pd
 
 from dao.base_dao import BaseDAO
@@ -20,6 +20,34 @@ class CategoryDAO(BaseDAO):
     
     CATEGORIES_TABLE = "categories"
     COMBINATIONS_TABLE = "valid_combinations"
+    STAGING_TABLE = "categories_staging"
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the Category DAO
+        
+        Args:
+            db_path: Path to the SQLite database
+        """
+        super().__init__(db_path)
+        # Valid combinations rarely change, so validation uses an in-process
+        # copy loaded on first use and dropped whenever this DAO changes them
+        self._combo_set: Optional[FrozenSet[Tuple[str, str, str]]] = None
+    
+    def _get_combo_set(self) -> FrozenSet[Tuple[str, str, str]]:
+        """
+        Get the cached set of valid combinations, loading it if needed
+        
+        Returns:
+            Frozen set of (l1, l2, l3) tuples
+        """
+        if self._combo_set is None:
+            query = "SELECT l1_category, l2_category, l3_category FROM {}".format(self.COMBINATIONS_TABLE)
+            self._combo_set = frozenset(
+                (row['l1_category'], row['l2_category'], row['l3_category'])
+                for row in self.execute_query(query)
+            )
+        return self._combo_set
     
     def get_all_categories(self) -> Dict[str, List[str]]:
         """
@@ -75,8 +103,8 @@ class CategoryDAO(BaseDAO):
                 logger.warning("Categories file not found: {}".format(csv_file))
                 return (0, 0)
                 
-            # Read CSV file
-            df = pd.read_csv(csv_file)
+            # Read CSV file; empty cells stay empty strings
+            df = pd.read_csv(csv_file, dtype=str, na_filter=False)
             
             # Identify category columns
             l1_col = None
@@ -109,62 +137,59 @@ class CategoryDAO(BaseDAO):
                     logger.error("Not enough columns in categories file")
                     return (0, 0)
             
-            # Extract unique categories
-            l1_categories = df[l1_col].dropna().unique().tolist()
-            l2_categories = df[l2_col].dropna().unique().tolist()
-            l3_categories = df[l3_col].dropna().unique().tolist()
-            
-            # Clear existing categories
-            self.execute_update("DELETE FROM {}".format(self.CATEGORIES_TABLE))
-            self.execute_update("DELETE FROM {}".format(self.COMBINATIONS_TABLE))
-            
-            # Insert L1 categories
-            for category in l1_categories:
-                self.execute_update(
-                    "INSERT INTO {} (level, category_name, description) VALUES (?, ?, ?)".format(self.CATEGORIES_TABLE),
-                    ('L1', category, 'Imported from CSV')
-                )
-            
-            # Insert L2 categories
-            for category in l2_categories:
-                self.execute_update(
-                    "INSERT INTO {} (level, category_name, description) VALUES (?, ?, ?)".format(self.CATEGORIES_TABLE),
-                    ('L2', category, 'Imported from CSV')
-                )
-            
-            # Insert L3 categories
-            for category in l3_categories:
-                self.execute_update(
-                    "INSERT INTO {} (level, category_name, description) VALUES (?, ?, ?)".format(self.CATEGORIES_TABLE),
-                    ('L3', category, 'Imported from CSV')
-                )
-            
-            # Insert valid combinations
-            combinations_count = 0
-            for _, row in df.iterrows():
-                l1 = row.get(l1_col)
-                l2 = row.get(l2_col)
-                l3 = row.get(l3_col)
-                
-                # Skip rows with missing values
-                if pd.isna(l1) or pd.isna(l2) or pd.isna(l3):
-                    continue
-                
-                self.execute_update(
-                    "INSERT INTO {} (l1_category, l2_category, l3_category) VALUES (?, ?, ?)".format(self.COMBINATIONS_TABLE),
-                    (l1, l2, l3)
-                )
-                combinations_count += 1
+            staging = df[[l1_col, l2_col, l3_col]]
+            staging.columns = ['l1', 'l2', 'l3']
+            
+            with self.get_connection() as conn:
+                try:
+                    # Load the rows into a staging table with multi-row INSERTs, then
+                    # derive both tables from it in SQL
+                    staging.to_sql(self.STAGING_TABLE, conn, if_exists='replace', index=False,
+                                   method='multi', chunksize=500)
+                    
+                    # Clear existing categories
+                    conn.execute("DELETE FROM {}".format(self.CATEGORIES_TABLE))
+                    conn.execute("DELETE FROM {}".format(self.COMBINATIONS_TABLE))
+                    
+                    cursor = conn.execute(
+                        """
+                        INSERT INTO {categories} (level, category_name, description)
+                        SELECT DISTINCT 'L1', l1, 'Imported from CSV' FROM {staging} WHERE l1 != ''
+                        UNION ALL
+                        SELECT DISTINCT 'L2', l2, 'Imported from CSV' FROM {staging} WHERE l2 != ''
+                        UNION ALL
+                        SELECT DISTINCT 'L3', l3, 'Imported from CSV' FROM {staging} WHERE l3 != ''
+                        """.format(categories=self.CATEGORIES_TABLE, staging=self.STAGING_TABLE)
+                    )
+                    categories_count = cursor.rowcount
+                    
+                    # Rows with a missing level are not valid combinations
+                    cursor = conn.execute(
+                        """
+                        INSERT INTO {combinations} (l1_category, l2_category, l3_category)
+                        SELECT DISTINCT l1, l2, l3 FROM {staging}
+                        WHERE l1 != '' AND l2 != '' AND l3 != ''
+                        """.format(combinations=self.COMBINATIONS_TABLE, staging=self.STAGING_TABLE)
+                    )
+                    combinations_count = cursor.rowcount
+                    
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    # to_sql commits the staging table on its own, so remove it on every path
+                    conn.execute("DROP TABLE IF EXISTS {}".format(self.STAGING_TABLE))
+                    conn.commit()
+            
+            self._combo_set = None
             
             logger.info("Imported {} categories and {} valid combinations".format(
-                len(l1_categories) + len(l2_categories) + len(l3_categories),
+                categories_count,
                 combinations_count
             ))
             
-            return (
-                len(l1_categories) + len(l2_categories) + len(l3_categories),
-                combinations_count
-            )
+            return (categories_count, combinations_count)
             
         except Exception as e:
             logger.error("Error importing categories from CSV: {}".format(str(e)))
@@ -182,13 +207,7 @@ class CategoryDAO(BaseDAO):
         Returns:
             True if the combination is valid, False otherwise
         """
-        query = """
-        SELECT COUNT(*) as count FROM {}
-        WHERE l1_category = ? AND l2_category = ? AND l3_category = ?
-        """.format(self.COMBINATIONS_TABLE)
-        
-        results = self.execute_query(query, (l1, l2, l3))
-        return results[0]['count'] > 0 if results else False
+        return (l1, l2, l3) in self._get_combo_set()
     
     def get_categories_by_level(self, level: str) -> List[str]:
         """
@@ -239,6 +258,7 @@ class CategoryDAO(BaseDAO):
         try:
             query = "INSERT INTO {} (l1_category, l2_category, l3_category) VALUES (?, ?, ?)".format(self.COMBINATIONS_TABLE)
             self.execute_update(query, (l1, l2, l3))
+            self._combo_set = None
             return True
         except Exception as e:
             logger.error("Error adding valid combination: {}".format(str(e)))
@@ -6,7 +6,7 @@ Provides database operations for system configuration settings.
 
 import logging
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import sqlite3
 
 from dao.base_dao import BaseDAO
@@ -23,6 +23,7 @@ class ConfigDAO(BaseDAO):
     
     TABLE_NAME = "system_config"
     ID_FIELD = "config_key"
+    DATA_TYPES = frozenset({"null", "bool", "int", "float", "str", "json"})
     
     def __init__(self, db_path: str):
         """
@@ -85,6 +86,39 @@ class ConfigDAO(BaseDAO):
             logger.error("Error retrieving configuration: {}".format(str(e)))
             raise DatabaseError("Error retrieving configuration") from e
     
+    def get_configs(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several configuration values in one query
+        
+        Args:
+            keys: Configuration keys to retrieve
+            
+        Returns:
+            Dictionary of the keys found, with values converted to the correct type.
+            Keys that are not set are left out.
+        """
+        if not keys:
+            return {}
+        
+        try:
+            with self.get_connection() as conn:
+                placeholders = ", ".join("?" * len(keys))
+                cursor = conn.execute(
+                    "SELECT config_key, config_value, data_type FROM {} WHERE config_key IN ({})".format(
+                        self.TABLE_NAME, placeholders
+                    ),
+                    tuple(keys)
+                )
+                
+                return {
+                    row['config_key']: self._convert_value(row['config_value'], row['data_type'])
+                    for row in cursor.fetchall()
+                }
+                
+        except sqlite3.Error as e:
+            logger.error("Error retrieving configurations: {}".format(str(e)))
+            raise DatabaseError("Error retrieving configurations") from e
+    
     def get_all_configs(self) -> Dict[str, Any]:
         """
         Get all configuration settings
@@ -131,19 +165,7 @@ class ConfigDAO(BaseDAO):
             timestamp = int(time.time())
             
             with self.get_connection() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO {} (config_key, config_value, data_type, description, last_updated, updated_by)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(config_key) DO UPDATE SET
-                    config_value = excluded.config_value,
-                    data_type = excluded.data_type,
-                    description = COALESCE(excluded.description, description),
-                    last_updated = excluded.last_updated,
-                    updated_by = excluded.updated_by
-                    """.format(self.TABLE_NAME),
-                    (key, value_str, data_type, description, timestamp, updated_by)
-                )
+                self._upsert_rows(conn, [(key, value_str, data_type, description, timestamp, updated_by)])
                 conn.commit()
                 
                 logger.info("Saved configuration: {} = {}".format(key, value))
@@ -153,6 +175,81 @@ class ConfigDAO(BaseDAO):
             logger.error("Error saving configuration: {}".format(str(e)))
             raise DatabaseError("Error saving configuration") from e
     
+    def save_configs(self, items: List[Tuple[str, Any, Optional[str]]], updated_by: str = None) -> int:
+        """
+        Save several configuration values in one transaction
+        
+        Args:
+            items: List of (key, value, description) tuples
+            updated_by: Optional username who updated the settings
+            
+        Returns:
+            Number of configurations saved
+        """
+        try:
+            import time
+            timestamp = int(time.time())
+            
+            rows = []
+            for key, value, description in items:
+                data_type, value_str = self._prepare_value(value)
+                rows.append((key, value_str, data_type, description, timestamp, updated_by))
+            
+            with self.get_connection() as conn:
+                self._upsert_rows(conn, rows)
+                conn.commit()
+                
+                logger.info("Saved {} configuration settings".format(len(rows)))
+                return len(rows)
+                
+        except Exception as e:
+            logger.error("Error saving configurations: {}".format(str(e)))
+            raise DatabaseError("Error saving configurations") from e
+    
+    def save_configs_raw(self, items: List[Tuple[str, Any, str, Optional[str]]], updated_by: str = None) -> int:
+        """
+        Save several already-serialized configuration values in one transaction
+        
+        Values are stored as given, so callers that already hold JSON payloads
+        skip the per-value type detection and encoding in _prepare_value.
+        
+        Args:
+            items: List of (key, value_str, data_type, description) tuples. value_str may be
+                str or UTF-8 bytes (e.g. from orjson.dumps) and must be in the format
+                _convert_value expects for data_type.
+            updated_by: Optional username who updated the settings
+            
+        Returns:
+            Number of configurations saved
+            
+        Raises:
+            ValueError: If an item has an unknown data type
+        """
+        try:
+            import time
+            timestamp = int(time.time())
+            
+            rows = []
+            for key, value_str, data_type, description in items:
+                if data_type not in self.DATA_TYPES:
+                    raise ValueError("Unknown configuration data type: {}".format(data_type))
+                if isinstance(value_str, (bytes, bytearray, memoryview)):
+                    value_str = bytes(value_str).decode('utf-8')
+                rows.append((key, value_str, data_type, description, timestamp, updated_by))
+            
+            with self.get_connection() as conn:
+                self._upsert_rows(conn, rows)
+                conn.commit()
+                
+                logger.info("Saved {} configuration settings".format(len(rows)))
+                return len(rows)
+                
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error("Error saving configurations: {}".format(str(e)))
+            raise DatabaseError("Error saving configurations") from e
+    
     def delete_config(self, key: str) -> bool:
         """
         Delete a configuration entry
@@ -226,30 +323,18 @@ class ConfigDAO(BaseDAO):
             import time
             timestamp = int(time.time())
             
+            rows = []
+            for key, value in configs.items():
+                data_type, value_str = self._prepare_value(value)
+                # A NULL description keeps the existing one
+                rows.append((key, value_str, data_type, None, timestamp, updated_by))
+            
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                saved_count = 0
-                
-                for key, value in configs.items():
-                    data_type, value_str = self._prepare_value(value)
-                    
-                    cursor.execute(
-                        """
-                        INSERT INTO {} (config_key, config_value, data_type, last_updated, updated_by)
-                        VALUES (?, ?, ?, ?, ?)
-                        ON CONFLICT(config_key) DO UPDATE SET
-                        config_value = excluded.config_value,
-                        data_type = excluded.data_type,
-                        last_updated = excluded.last_updated,
-                        updated_by = excluded.updated_by
-                        """.format(self.TABLE_NAME),
-                        (key, value_str, data_type, timestamp, updated_by)
-                    )
-                    saved_count += 1
-                
+                self._upsert_rows(conn, rows)
                 conn.commit()
-                logger.info("Saved {} configuration settings".format(saved_count))
-                return saved_count
+                
+                logger.info("Saved {} configuration settings".format(len(rows)))
+                return len(rows)
                 
         except Exception as e:
             logger.error("Error saving multiple configurations: {}".format(str(e)))
@@ -297,6 +382,29 @@ class ConfigDAO(BaseDAO):
             logger.error("Error retrieving configuration history: {}".format(str(e)))
             raise DatabaseError("Error retrieving configuration history") from e
     
+    def _upsert_rows(self, conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        """
+        Insert or update configuration rows on an open connection
+        
+        Args:
+            conn: Database connection; the caller commits
+            rows: List of (key, value_str, data_type, description, last_updated, updated_by)
+                tuples. A None description keeps the stored description.
+        """
+        conn.executemany(
+            """
+            INSERT INTO {} (config_key, config_value, data_type, description, last_updated, updated_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(config_key) DO UPDATE SET
+            config_value = excluded.config_value,
+            data_type = excluded.data_type,
+            description = COALESCE(excluded.description, description),
+            last_updated = excluded.last_updated,
+            updated_by = excluded.updated_by
+            """.format(self.TABLE_NAME),
+            rows
+        )
+    
     def _prepare_value(self, value: Any) -> tuple:
         """
         Prepare a value for storage by determining its type and converting to string
@@ -9,7 +9,7 @@ import logging
 import time
 import queue
 import threading
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Generator
 from contextlib import contextmanager
 
 # Configure logging
@@ -42,12 +42,30 @@ class ConnectionPool:
         """Initialize the connection pool with initial connections"""
         logger.info("Initializing connection pool for {} with {} max connections".format(self.db_path, self.max_connections))
         # Start with one connection to avoid creating too many at startup
-        self._create_connection()
+        self.prewarm(1)
+    
+    def prewarm(self, count: int):
+        """
+        Open connections up front so the first callers don't pay for them
+        
+        Args:
+            count: Number of idle connections to have ready, capped at max_connections
+        """
+        with self.lock:
+            missing = min(count, self.max_connections) - self.pool.qsize()
+            for _ in range(missing):
+                if self.active_connections >= self.max_connections:
+                    break
+                self.pool.put(self._create_connection(), block=False)
     
     def _create_connection(self) -> sqlite3.Connection:
         """Create a new SQLite connection"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            # Pooled connections move between threads, but only one holds a
+            # connection at a time. The statement cache outlives each checkout.
+            # journal_mode is stored in the database file, so setup_database sets
+            # WAL once rather than every new connection
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
             # Enable foreign keys
             conn.execute("PRAGMA foreign_keys = ON")
             # Return dictionary-like rows
@@ -96,6 +114,10 @@ class ConnectionPool:
         """Return a connection to the pool"""
         if conn is None:
             return
+        
+        # Don't hand a half-finished transaction to the next caller
+        if conn.in_transaction:
+            conn.rollback()
             
         try:
             # Put the connection back in the pool
@@ -108,6 +130,20 @@ class ConnectionPool:
                 self.active_connections -= 1
             logger.debug("Closed connection (active: {})".format(self.active_connections))
     
+    @contextmanager
+    def acquire(self) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Context manager that checks a connection out of the pool
+        
+        Yields:
+            A SQLite connection, returned to the pool on exit
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            self.return_connection(conn)
+    
     def close_all(self):
         """Close all connections in the pool"""
         logger.info("Closing all database connections")
@@ -7,11 +7,14 @@ Provides database operations for transcriptions.
 import sqlite3
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 import os
 import csv
+from itertools import chain, islice
 from datetime import datetime
 
+from dao.base_dao import null_if_blank
+
 logger = logging.getLogger(__name__)
 
 class TranscriptionDAO:
@@ -20,6 +23,13 @@ class TranscriptionDAO:
     TABLE_NAME = "call_transcriptions"
     ID_FIELD = "call_id"
     
+    # Columns written by save() and bulk_insert()
+    FIELDS = [
+        "call_id", "file_name", "file_path", "file_size", "call_date",
+        "duration_seconds", "speaker_count", "transcription", "transcription_status",
+        "transcription_error", "analyzed"
+    ]
+    
     def __init__(self, db_path: str):
         """
         Initialize with database path
@@ -78,6 +88,42 @@ class TranscriptionDAO:
             if conn:
                 conn.close()
     
+    def iter_all(self, limit: Optional[int] = None, analyzed_only: bool = False) -> Iterator[sqlite3.Row]:
+        """
+        Iterate over transcriptions, newest first, without building a list
+        
+        Rows are fetched from the cursor as they are consumed. The connection
+        is closed when the iterator is exhausted or closed.
+        
+        Args:
+            limit: Maximum number of records to return, or None for all
+            analyzed_only: Whether to return only analyzed transcriptions
+            
+        Yields:
+            Transcription rows
+        """
+        query = f"SELECT * FROM {self.TABLE_NAME}"
+        params = ()
+        
+        if analyzed_only:
+            query += " WHERE analyzed = 1"
+            
+        query += " ORDER BY import_date DESC"
+        
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        
+        conn = None
+        try:
+            conn = self._get_connection()
+            yield from conn.execute(query, params)
+        except sqlite3.Error as e:
+            logger.error(f"Error iterating transcriptions: {str(e)}")
+        finally:
+            if conn:
+                conn.close()
+    
     def get_by_id(self, call_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a transcription by ID
@@ -134,11 +180,7 @@ class TranscriptionDAO:
             
             exists = cursor.fetchone()[0] > 0
             
-            # Prepare fields for insert/update
-            fields = [
-                "call_id", "file_name", "file_path", "file_size", "call_date",
-                "duration_seconds", "speaker_count", "transcription", "analyzed"
-            ]
+            fields = self.FIELDS
             
             if exists:
                 # Update existing record
@@ -236,6 +278,9 @@ class TranscriptionDAO:
                             error_count += 1
                             continue
                         
+                        # Missing sizes and durations are stored as NULL rather than ''
+                        row = {key: null_if_blank(value) for key, value in row.items()}
+                        
                         # Save the transcription
                         if self.save(row):
                             success_count += 1
@@ -255,6 +300,167 @@ class TranscriptionDAO:
             if conn:
                 conn.close()
     
+    def _upsert_clause(self, fields: List[str]) -> str:
+        """
+        Build the ON CONFLICT clause that makes an insert behave like save()
+        
+        Args:
+            fields: Columns being inserted
+            
+        Returns:
+            ON CONFLICT ... DO UPDATE clause for the ID field
+        """
+        updates = [f"{field} = excluded.{field}" for field in fields if field != self.ID_FIELD]
+        updates.append("last_updated = CURRENT_TIMESTAMP")
+        return f"ON CONFLICT({self.ID_FIELD}) DO UPDATE SET {', '.join(updates)}"
+    
+    def bulk_insert(self, rows: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Insert or update transcriptions in bulk
+        
+        Rows are streamed in chunks through executemany inside a single
+        transaction, so a large import costs one commit instead of one per row.
+        Like save(), an existing call ID has its columns overwritten. The
+        columns written are taken from the first row.
+        
+        Args:
+            rows: Transcription dictionaries with the same keys, e.g. a csv.DictReader
+            chunk_size: Number of rows passed to each executemany call
+            
+        Returns:
+            Number of rows inserted or updated
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        
+        fields = [field for field in self.FIELDS if field in first]
+        if self.ID_FIELD not in fields:
+            logger.error(f"Missing required field {self.ID_FIELD} in bulk insert rows")
+            return 0
+        
+        placeholders = ", ".join(["?"] * len(fields))
+        query = (
+            f"INSERT INTO {self.TABLE_NAME} ({', '.join(fields)}) VALUES ({placeholders}) "
+            f"{self._upsert_clause(fields)}"
+        )
+        
+        conn = None
+        inserted = 0
+        try:
+            conn = self._get_connection()
+            conn.execute("BEGIN")
+            cursor = conn.cursor()
+            
+            rows = chain([first], rows)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                
+                cursor.executemany(query, [
+                    tuple(null_if_blank(row.get(field)) for field in fields)
+                    for row in chunk
+                ])
+                inserted += cursor.rowcount
+            
+            conn.commit()
+            logger.info(f"Bulk saved {inserted} transcriptions")
+            return inserted
+            
+        except Exception as e:
+            logger.error(f"Error bulk inserting transcriptions: {str(e)}")
+            if conn:
+                conn.rollback()
+            return 0
+        finally:
+            if conn:
+                conn.close()
+    
+    def import_csv_bulk(self, csv_file: str) -> int:
+        """
+        Bulk-load a CSV file, inserting or updating transcriptions like save()
+        
+        When SQLite's csv extension can be loaded, the file is read through a
+        csv virtual table and upserted with a single INSERT ... SELECT, so rows
+        never pass through Python. If the extension is missing or that load
+        fails, the rows go through bulk_insert instead.
+        
+        Args:
+            csv_file: Path to CSV file with a header row
+            
+        Returns:
+            Number of rows inserted or updated
+        """
+        with open(csv_file, 'r', newline='') as f:
+            header = next(csv.reader(f), [])
+        
+        fields = [field for field in self.FIELDS if field in header]
+        if self.ID_FIELD not in fields:
+            logger.error(f"Missing required field {self.ID_FIELD} in {csv_file}")
+            return 0
+        
+        inserted = self._import_csv_vtable(csv_file, fields)
+        if inserted is not None:
+            return inserted
+        
+        with open(csv_file, 'r', newline='') as f:
+            return self.bulk_insert(csv.DictReader(f))
+    
+    def _import_csv_vtable(self, csv_file: str, fields: List[str]) -> Optional[int]:
+        """
+        Upsert a CSV file through SQLite's csv virtual table
+        
+        Args:
+            csv_file: Path to CSV file with a header row
+            fields: Columns to load, all present in the header
+            
+        Returns:
+            Number of rows inserted or updated, or None if the caller should
+            fall back to bulk_insert
+        """
+        conn = self._get_connection()
+        try:
+            conn.enable_load_extension(True)
+            conn.load_extension("csv")
+            conn.enable_load_extension(False)
+        except (AttributeError, sqlite3.Error) as e:
+            conn.close()
+            logger.info(f"SQLite csv extension not available ({str(e)}), importing rows in batches")
+            return None
+        
+        try:
+            filename = csv_file.replace("'", "''")
+            conn.execute(f"CREATE VIRTUAL TABLE temp.csv_import USING csv(filename='{filename}', header=YES)")
+            
+            # The csv module reads empty cells as ''; NULLIF is the SQL side of null_if_blank()
+            columns = ", ".join(f"NULLIF(\"{field}\", '')" for field in fields)
+            
+            # WHERE true keeps the parser from reading ON CONFLICT as a join constraint
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                f"INSERT INTO {self.TABLE_NAME} ({', '.join(fields)}) "
+                f"SELECT {columns} FROM temp.csv_import WHERE true "
+                f"{self._upsert_clause(fields)}"
+            )
+            inserted = cursor.rowcount
+            conn.commit()
+            
+            logger.info(f"Bulk saved {inserted} transcriptions from {csv_file}")
+            return inserted
+            
+        except Exception as e:
+            logger.warning(f"csv virtual table import of {csv_file} failed ({str(e)}), importing rows in batches")
+            conn.rollback()
+            return None
+        finally:
+            try:
+                conn.execute("DROP TABLE IF EXISTS temp.csv_import")
+            except sqlite3.Error:
+                pass
+            conn.close()
+    
     def export_to_csv(self, csv_file: str, analyzed_only: bool = False) -> bool:
         """
         Export transcriptions to a CSV file
@@ -6,6 +6,7 @@ Handles database operations related to users and authentication.
 
 import logging
 import hashlib
+import hmac
 import os
 import time
 from typing import Dict, List, Optional, Tuple, Any
@@ -13,6 +14,7 @@ import sqlite3
 
 from dao.base_dao import BaseDAO
 from exceptions.database_exceptions import DatabaseError, RecordNotFoundError
+from utils.auth.password import hash_password, is_scrypt_hash, verify_password
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -130,6 +132,28 @@ class UserDAO(BaseDAO):
             logger.error("Database error getting user by username: {}".format(str(e)))
             raise DatabaseError("Error retrieving user data") from e
     
+    def username_exists(self, username: str) -> bool:
+        """
+        Check whether a username is taken
+        
+        Args:
+            username: The username to look up
+            
+        Returns:
+            True if a user (active or not) has this username, False otherwise
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    "SELECT 1 FROM users WHERE username = ? LIMIT 1",
+                    (username,)
+                )
+                
+                return cursor.fetchone() is not None
+        except sqlite3.Error as e:
+            logger.error("Database error checking username: {}".format(str(e)))
+            raise DatabaseError("Error checking username") from e
+    
     def authenticate_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """
         Authenticate a user with username and password
@@ -150,11 +174,14 @@ class UserDAO(BaseDAO):
                 return None
             
             # Verify password
-            password_hash = self._hash_password(password, username)
-            if password_hash != user['password_hash']:
+            if not self._verify_password(password, username, user['password_hash']):
                 logger.warning("Failed login attempt for user: {}".format(username))
                 return None
             
+            # Upgrade hashes from the old unsalted SHA-256 scheme on successful login
+            if not is_scrypt_hash(user['password_hash']):
+                self._update_password_hash(user['user_id'], hash_password(password))
+            
             # Update last login time
             self._update_last_login(user['user_id'])
             logger.info("User authenticated: {}".format(username))
@@ -192,7 +219,7 @@ class UserDAO(BaseDAO):
         """
         try:
             # Hash the password
-            password_hash = self._hash_password(password, username)
+            password_hash = hash_password(password)
             
             # Generate unique user ID
             user_id = self._generate_user_id()
@@ -252,8 +279,7 @@ class UserDAO(BaseDAO):
             if 'password' in safe_updates:
                 # If password is in updates, convert to password_hash
                 password = safe_updates.pop('password')
-                username = self.get_user_by_id(user_id)['username']
-                safe_updates['password_hash'] = self._hash_password(password, username)
+                safe_updates['password_hash'] = hash_password(password)
             
             if not safe_updates:
                 return True  # Nothing to update
@@ -492,20 +518,38 @@ class UserDAO(BaseDAO):
             logger.error("Failed to get user activity logs: {}".format(str(e)))
             return []
     
-    def _hash_password(self, password: str, salt: str) -> str:
+    def _verify_password(self, password: str, username: str, password_hash: str) -> bool:
         """
-        Hash a password with a salt
+        Check a password against a stored hash
         
         Args:
-            password: Password to hash
-            salt: Salt to use (username)
+            password: Password to check (plaintext)
+            username: Username, which salted hashes from the old SHA-256 scheme
+            password_hash: Stored hash, either "salt_hex:key_hex" or a legacy SHA-256 hex digest
             
         Returns:
-            Hashed password
+            True if the password matches, False otherwise
         """
-        # Use SHA-256 for password hashing - in real app, use better algorithm like bcrypt
-        combined = (password + salt).encode('utf-8')
-        return hashlib.sha256(combined).hexdigest()
+        if is_scrypt_hash(password_hash):
+            return verify_password(password, password_hash)
+        
+        legacy_hash = hashlib.sha256((password + username).encode('utf-8')).hexdigest()
+        return hmac.compare_digest(legacy_hash, password_hash)
+    
+    def _update_password_hash(self, user_id: str, password_hash: str) -> bool:
+        """Replace the stored password hash for a user"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute(
+                    "UPDATE users SET password_hash = ? WHERE user_id = ?",
+                    (password_hash, user_id)
+                )
+                conn.commit()
+                
+                return True
+        except sqlite3.Error as e:
+            logger.error("Failed to update password hash: {}".format(str(e)))
+            return False
     
     def _generate_user_id(self) -> str:
         """Generate a unique user ID"""
@@ -14,6 +14,8 @@ import hashlib
 # Import the connection pool
 from db_connection_pool import get_db_connection
 
+from utils.text.text_processor import get_transcription_status
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -116,8 +118,8 @@ class TranscriptionDAO:
                     file_name = row.get('file_name', '')
                     transcription = row.get('transcription', '')
                     
-                    # Skip invalid transcriptions
-                    if not isinstance(transcription, str) or not transcription.strip() or transcription.startswith("ERROR:"):
+                    # Skip failed and empty transcriptions
+                    if get_transcription_status(row) != "ok":
                         continue
                     
                     # Extract call date from filename if available
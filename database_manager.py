@@ -8,6 +8,7 @@ from contextlib import contextmanager
 from typing import Optional, List, Dict, Any, Generator, Tuple
 import pandas as pd
 
+from utils.text.text_processor import extract_dates, get_transcription_status
 
 try:
     from call_analysis import logger
@@ -172,6 +173,10 @@ class DatabaseManager:
             df = pd.read_csv(csv_file)
             imported_count = 0
             
+            # Extract call dates from all filenames up front
+            if 'file_name' in df.columns:
+                df['call_date'] = extract_dates(df['file_name'].fillna('').astype(str))
+            
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
@@ -180,12 +185,11 @@ class DatabaseManager:
                     file_name = row.get('file_name', '')
                     transcription = row.get('transcription', '')
                     
-                    # Skip invalid transcriptions
-                    if not isinstance(transcription, str) or not transcription.strip() or transcription.startswith("ERROR:"):
+                    # Skip failed and empty transcriptions
+                    if get_transcription_status(row) != "ok":
                         continue
                     
-                    # Extract call date from filename
-                    call_date = TextProcessor.extract_date_from_filename(file_name)
+                    call_date = row.get('call_date', '')
                     
                     # Get duration if available
                     duration = row.get('duration_seconds', 0)
@@ -9,11 +9,23 @@ import os
 import sys
 import logging
 import asyncio
+import math
 import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import glob
 import json
+import shutil
+from itertools import islice
+
+try:
+    from itertools import batched
+except ImportError:  # Python < 3.12
+    def batched(iterable, n):
+        """Yield successive tuples of up to n items from iterable"""
+        iterator = iter(iterable)
+        while batch := tuple(islice(iterator, n)):
+            yield batch
 
 # Import Database Layer
 from dao.transcription_dao import TranscriptionDAO
@@ -22,6 +34,7 @@ from dao.stats_dao import StatsDAO
 
 # Import Configuration manager 
 from config_manager import config
+from utils.text.text_processor import get_transcription_status
 
 # Import API clients
 from api.clients.elevenlabs_client import ElevenLabsClient
@@ -38,6 +51,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Suffix for Opus transcodes cached next to the original clip
+OPUS_SUFFIX = ".opus.ogg"
+
+# ffmpeg arguments for a telephony-grade Opus upload (16 kbps, mono, 16 kHz)
+OPUS_FFMPEG_ARGS = ["-c:a", "libopus", "-b:a", "16k", "-ac", "1", "-ar", "16000", "-f", "ogg"]
+
 class ClipProcessor:
     """Process call center audio clips end-to-end"""
     
@@ -53,6 +72,13 @@ class ClipProcessor:
         self.clips_dir = clips_dir or config.get("clips_dir")
         self.batch_size = batch_size or config.get("batch_size", 10)
         self.db_path = config.get("db_path")
+        self.transcode_uploads = config.get("transcode_uploads", True)
+        self.min_transcode_bytes = config.get("min_transcode_bytes", 256 * 1024)
+        
+        # Check for ffmpeg once rather than failing to start it for every clip
+        if self.transcode_uploads and shutil.which("ffmpeg") is None:
+            logger.warning("ffmpeg not found on PATH; uploading original clips without transcoding")
+            self.transcode_uploads = False
         
         # Initialize DAOs
         self.transcription_dao = TranscriptionDAO(self.db_path)
@@ -139,6 +165,79 @@ class ClipProcessor:
             "call_id": file_name,  # Use filename as call_id
         }
     
+    async def _ensure_upload_format(self, file_path: str) -> str:
+        """
+        Get the path of the file to upload, transcoding it to Opus if worthwhile
+        
+        Files larger than min_transcode_bytes are transcoded once with ffmpeg and
+        the result is cached next to the original with an .opus.ogg suffix.
+        
+        Args:
+            file_path: Path to the original audio file
+            
+        Returns:
+            Path to the Opus transcode, or the original path if transcoding is
+            disabled, not worthwhile or failed
+        """
+        if not self.transcode_uploads:
+            return file_path
+        
+        opus_path = os.path.splitext(file_path)[0] + OPUS_SUFFIX
+        
+        def _stat_paths():
+            source_stat = os.stat(file_path)
+            try:
+                cached_mtime = os.stat(opus_path).st_mtime
+            except FileNotFoundError:
+                cached_mtime = None
+            return source_stat.st_size, source_stat.st_mtime, cached_mtime
+        
+        try:
+            file_size, source_mtime, cached_mtime = await asyncio.to_thread(_stat_paths)
+        except OSError as e:
+            logger.warning(f"Could not stat {file_path}, uploading original: {str(e)}")
+            return file_path
+        
+        if file_size <= self.min_transcode_bytes:
+            return file_path
+        
+        # Reuse a cached transcode unless the original changed since
+        if cached_mtime is not None and cached_mtime >= source_mtime:
+            return opus_path
+        
+        temp_path = f"{opus_path}.temp"
+        
+        def _remove_temp():
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-y", "-loglevel", "error", "-i", file_path,
+                *OPUS_FFMPEG_ARGS, temp_path,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            
+            if process.returncode != 0:
+                logger.warning(
+                    f"Opus transcode failed for {file_path}, uploading original: "
+                    f"{stderr.decode(errors='replace').strip()}"
+                )
+                await asyncio.to_thread(_remove_temp)
+                return file_path
+            
+            await asyncio.to_thread(os.replace, temp_path, opus_path)
+            logger.info(f"Transcoded {os.path.basename(file_path)} to Opus for upload")
+            return opus_path
+            
+        except OSError as e:
+            logger.warning(f"Could not run ffmpeg for {file_path}, uploading original: {str(e)}")
+            return file_path
+    
     async def transcribe_file(self, file_path: str) -> Dict[str, Any]:
         """
         Transcribe an audio file
@@ -154,8 +253,11 @@ class ClipProcessor:
         try:
             logger.info(f"Transcribing {metadata['file_name']}...")
             
+            # Upload a smaller Opus transcode when possible
+            upload_path = await self._ensure_upload_format(file_path)
+            
             # Read the audio file
-            with open(file_path, 'rb') as audio_file:
+            with open(upload_path, 'rb') as audio_file:
                 audio_data = audio_file.read()
             
             # Transcribe using ElevenLabs
@@ -164,12 +266,15 @@ class ClipProcessor:
             transcription_result = self.elevenlabs_client.transcribe_audio(
                 audio_data=audio_data,
                 language_code="en",  # Use appropriate language code
-                model_id="scribe_v1"  # Use appropriate model ID
+                model_id="scribe_v1",  # Use appropriate model ID
+                file_name=os.path.basename(upload_path)
             )
             
             if transcription_result.get("status") == "error":
                 logger.error(f"Transcription failed: {transcription_result.get('error')}")
-                metadata["transcription"] = f"ERROR: {transcription_result.get('error')}"
+                metadata["transcription"] = ""
+                metadata["transcription_status"] = "error"
+                metadata["transcription_error"] = transcription_result.get("error")
                 self.stats["transcription_failed"] += 1
                 return metadata
             
@@ -177,7 +282,9 @@ class ClipProcessor:
             transcription_text = transcription_result.get("text", "")
             if not transcription_text:
                 logger.warning(f"Empty transcription for {metadata['file_name']}")
-                metadata["transcription"] = "ERROR: Empty transcription"
+                metadata["transcription"] = ""
+                metadata["transcription_status"] = "empty"
+                metadata["transcription_error"] = None
                 self.stats["transcription_failed"] += 1
                 return metadata
             
@@ -191,6 +298,8 @@ class ClipProcessor:
             
             # Add transcription to metadata
             metadata["transcription"] = transcription_text
+            metadata["transcription_status"] = "ok"
+            metadata["transcription_error"] = None
             metadata["speaker_count"] = transcription_result.get("speaker_count", 1)
             
             logger.info(f"Transcription completed: {len(transcription_text)} characters")
@@ -200,7 +309,9 @@ class ClipProcessor:
             
         except Exception as e:
             logger.error(f"Error transcribing {file_path}: {str(e)}")
-            metadata["transcription"] = f"ERROR: {str(e)}"
+            metadata["transcription"] = ""
+            metadata["transcription_status"] = "error"
+            metadata["transcription_error"] = str(e)
             self.stats["transcription_failed"] += 1
             return metadata
     
@@ -233,20 +344,21 @@ class ClipProcessor:
             Analysis results
         """
         call_id = transcription_data.get("call_id")
-        transcription = transcription_data.get("transcription", "")
+        transcription = transcription_data.get("transcription") or ""
+        transcription_status = get_transcription_status(transcription_data)
         
         # Skip if there was an error in transcription
-        if transcription.startswith("ERROR:"):
+        if transcription_status == "error":
             logger.warning(f"Skipping analysis for {call_id} due to transcription error")
             return {
                 "call_id": call_id,
                 "analysis_status": "failed",
-                "api_error": "Transcription error",
+                "api_error": transcription_data.get("transcription_error") or "Transcription error",
                 "issue_summary": "Could not analyze due to transcription error."
             }
         
         # Skip if transcription is empty
-        if not transcription or len(transcription.strip()) < 10:
+        if transcription_status == "empty" or len(transcription.strip()) < 10:
             logger.warning(f"Skipping analysis for {call_id} due to empty/short transcription")
             return {
                 "call_id": call_id,
@@ -455,15 +567,15 @@ class ClipProcessor:
         logger.info(f"Starting to process {len(files)} files in batches of {self.batch_size}")
         
         # Process files in batches
-        for i in range(0, len(files), self.batch_size):
-            batch = files[i:i+self.batch_size]
-            logger.info(f"Processing batch {i//self.batch_size + 1}/{(len(files)-1)//self.batch_size + 1} ({len(batch)} files)")
+        total_batches = math.ceil(len(files) / self.batch_size)
+        for batch_num, batch in enumerate(batched(files, self.batch_size), 1):
+            logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} files)")
             
             # Process each file in the batch concurrently
             tasks = [self.process_file(file) for file in batch]
             await asyncio.gather(*tasks)
             
-            logger.info(f"Completed batch {i//self.batch_size + 1}")
+            logger.info(f"Completed batch {batch_num}")
         
         # Save final statistics
         self.save_processing_stats()
@@ -6,22 +6,346 @@ Creates all necessary tables and indexes for the system.
 
 import os
 import sys
+import json
 import sqlite3
+import queue
 import logging
+import logging.handlers
 import argparse
-from typing import List, Dict, Any
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("database_setup.log"),
-        logging.StreamHandler()
-    ]
-)
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.request import pathname2url
+
+from utils.auth.password import hash_password
+
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_FILE = "database_setup.log"
+
+def _configure_logging(to_file: bool = False) -> Optional[logging.handlers.QueueListener]:
+    """
+    Configure logging for the command line entry point
+    
+    Logs always go to the console. File logging is opt-in, and the file handler
+    runs behind a queue on a listener thread so setup steps never block on
+    file writes.
+    
+    Args:
+        to_file: Whether to also write logs to LOG_FILE
+        
+    Returns:
+        The running queue listener when logging to file, otherwise None
+    """
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, handlers=[logging.StreamHandler()])
+    
+    if not to_file:
+        return None
+    
+    # The queue handler is added after basicConfig so records are only
+    # formatted once, by the file handler on the listener thread
+    file_handler = logging.FileHandler(LOG_FILE)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    logging.getLogger().addHandler(logging.handlers.QueueHandler(log_queue))
+    return listener
+
+# PRAGMAs applied to every connection: WAL with NORMAL sync avoids an fsync per
+# commit, and the larger page cache and mmap serve reads from memory. The stdlib
+# driver does not accept PRAGMAs in the connection URI, so they go in one script.
+# journal_mode is set separately because its result reports whether WAL took effect.
+CONNECTION_PRAGMAS = """
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -65536;
+PRAGMA mmap_size = 268435456;
+PRAGMA foreign_keys = ON;
+PRAGMA busy_timeout = 5000;
+"""
+
+# Page size for new databases. Wider pages keep the b-trees shallower and cut
+# overflow chains for the long transcription and raw_json values. It can only
+# be chosen before the first write, and not at all once the file is in WAL mode.
+PAGE_SIZE = 8192
+
+# Valid category combinations, keyed and clustered on the combination itself so
+# the table is a single b-tree and lookups by (l1) or (l1, l2) are prefix scans
+VALID_COMBINATIONS_SQL = """CREATE TABLE IF NOT EXISTS valid_combinations (
+    l1_category TEXT NOT NULL,
+    l2_category TEXT NOT NULL,
+    l3_category TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (l1_category, l2_category, l3_category)
+) WITHOUT ROWID, STRICT;"""
+
+# Schema for all tables. Tables written only with typed values are STRICT. The
+# users, sessions and audit_log tables are not: their timestamp columns hold
+# CURRENT_TIMESTAMP text from the defaults here alongside the integer epoch
+# seconds UserDAO writes, so no single STRICT storage class fits them.
+SCHEMA_SQL = f"""
+-- Call transcriptions table
+CREATE TABLE IF NOT EXISTS call_transcriptions (
+    call_id TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    file_path TEXT,
+    file_size INTEGER,
+    call_date TEXT,
+    duration_seconds REAL,
+    speaker_count INTEGER,
+    transcription TEXT,
+    transcription_status TEXT,
+    transcription_error TEXT,
+    import_date TEXT DEFAULT CURRENT_TIMESTAMP,
+    analyzed INTEGER DEFAULT 0,
+    last_updated TEXT DEFAULT CURRENT_TIMESTAMP
+) STRICT;
+
+-- Analysis results table
+CREATE TABLE IF NOT EXISTS analysis_results (
+    call_id TEXT PRIMARY KEY,
+    analysis_status TEXT NOT NULL,
+    primary_issue_category TEXT,
+    specific_issue TEXT,
+    issue_severity TEXT,
+    confidence_score REAL,
+    api_error TEXT,
+    issue_summary TEXT,
+    raw_json TEXT,
+    processing_time_ms REAL,
+    model TEXT,
+    call_date TEXT,
+    analysis_date TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (call_id) REFERENCES call_transcriptions(call_id) ON DELETE CASCADE
+) STRICT;
+
+-- Categories table
+CREATE TABLE IF NOT EXISTS categories (
+    category_id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    UNIQUE(level, name)
+) STRICT;
+
+-- Valid category combinations
+{VALID_COMBINATIONS_SQL}
+
+-- Analysis stats table for batch runs
+CREATE TABLE IF NOT EXISTS analysis_stats (
+    run_id INTEGER PRIMARY KEY,
+    run_date TEXT NOT NULL,
+    total_processed INTEGER NOT NULL,
+    successful INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    avg_confidence REAL,
+    avg_processing_time REAL,
+    model TEXT,
+    batch_size INTEGER,
+    total_tokens INTEGER,
+    total_cost REAL,
+    run_duration_seconds REAL
+) STRICT;
+
+-- Configuration table
+CREATE TABLE IF NOT EXISTS config (
+    config_key TEXT PRIMARY KEY,
+    config_value TEXT,
+    value_type TEXT,
+    description TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+) STRICT, WITHOUT ROWID;
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    email TEXT UNIQUE,
+    role TEXT NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+-- Sessions table
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP,
+    ip_address TEXT,
+    user_agent TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    FOREIGN KEY (user_id) REFERENCES users(user_id)
+);
+
+-- Audit log table (AUTOINCREMENT so log IDs are never reused after a purge)
+CREATE TABLE IF NOT EXISTS audit_log (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    action TEXT NOT NULL,
+    resource_type TEXT,
+    resource_id TEXT,
+    details TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id)
+);
+"""
+
+# Indexes matching the main query shapes, as (name, DDL). Only the ones missing
+# from the database are created on each run.
+REQUIRED_INDEXES: List[Tuple[str, str]] = [
+    # call_transcriptions
+    ("idx_call_transcriptions_call_date", "CREATE INDEX IF NOT EXISTS idx_call_transcriptions_call_date ON call_transcriptions(call_date)"),
+    ("idx_call_transcriptions_analyzed_date", "CREATE INDEX IF NOT EXISTS idx_call_transcriptions_analyzed_date ON call_transcriptions(analyzed, call_date)"),
+
+    # analysis_results
+    ("idx_analysis_results_status", "CREATE INDEX IF NOT EXISTS idx_analysis_results_status ON analysis_results(analysis_status)"),
+    ("idx_analysis_results_severity", "CREATE INDEX IF NOT EXISTS idx_analysis_results_severity ON analysis_results(issue_severity)"),
+    ("idx_analysis_results_confidence", "CREATE INDEX IF NOT EXISTS idx_analysis_results_confidence ON analysis_results(confidence_score)"),
+    ("idx_analysis_results_category_severity", "CREATE INDEX IF NOT EXISTS idx_analysis_results_category_severity ON analysis_results(primary_issue_category, issue_severity, confidence_score)"),
+    ("idx_analysis_results_date_status", "CREATE INDEX IF NOT EXISTS idx_analysis_results_date_status ON analysis_results(call_date DESC, analysis_status)"),
+
+    # categories
+    ("idx_categories_level", "CREATE INDEX IF NOT EXISTS idx_categories_level ON categories(level)"),
+
+    # analysis_stats
+    ("idx_analysis_stats_date", "CREATE INDEX IF NOT EXISTS idx_analysis_stats_date ON analysis_stats(run_date)"),
+
+    # users
+    ("idx_users_role", "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)"),
+    ("idx_users_active", "CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active)"),
+
+    # sessions
+    ("idx_sessions_user_active", "CREATE INDEX IF NOT EXISTS idx_sessions_user_active ON sessions(user_id, is_active)"),
+    ("idx_sessions_active", "CREATE INDEX IF NOT EXISTS idx_sessions_active ON sessions(is_active)"),
+
+    # audit_log
+    ("idx_audit_log_user_timestamp", "CREATE INDEX IF NOT EXISTS idx_audit_log_user_timestamp ON audit_log(user_id, timestamp DESC)"),
+    ("idx_audit_log_action", "CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log(action)"),
+    ("idx_audit_log_timestamp", "CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp)"),
+]
+
+# Indexes superseded by the composite indexes or primary keys above, dropped if present
+OBSOLETE_INDEXES: List[str] = [
+    "idx_call_transcriptions_analyzed",
+    "idx_analysis_results_category",
+    "idx_analysis_results_call_date",
+    "idx_sessions_user",
+    "idx_audit_log_user",
+    "idx_valid_combinations_l1",
+    "idx_valid_combinations_l2",
+]
+
+# Default categories for call classification as (level, name, description)
+DEFAULT_CATEGORIES = [
+    # Level 1 categories
+    (1, "Account Access", "Issues related to logging in or accessing accounts"),
+    (1, "Billing", "Issues related to bills, payments, or charges"),
+    (1, "Technical Issue", "Technical problems with systems or applications"),
+    (1, "Product Information", "Questions about products or services"),
+    (1, "Complaint", "Customer complaints about service or experience"),
+
+    # Level 2 categories
+    (2, "Login Problem", "Problems logging into accounts"),
+    (2, "Password Reset", "Assistance with password resets"),
+    (2, "Account Locked", "Account is locked due to security reasons"),
+    (2, "Payment Issue", "Problems with payments"),
+    (2, "Billing Error", "Errors on bills or statements"),
+    (2, "Refund Request", "Requests for refunds"),
+    (2, "App Error", "Errors in mobile or web applications"),
+    (2, "System Unavailable", "Systems that are down or unreachable"),
+    (2, "Feature Question", "Questions about specific features"),
+    (2, "Product Comparison", "Comparing different products or plans"),
+    (2, "Service Complaint", "Complaints about service quality"),
+    (2, "Staff Complaint", "Complaints about staff behavior"),
+
+    # Level 3 categories
+    (3, "Forgotten Password", "User has forgotten their password"),
+    (3, "Account Verification", "Issues verifying account identity"),
+    (3, "Two-Factor Authentication", "Issues with 2FA"),
+    (3, "Payment Declined", "Payment method was declined"),
+    (3, "Double Charge", "Customer was charged twice"),
+    (3, "Missing Credit", "Credit not applied to account"),
+    (3, "App Crash", "Application crashes or freezes"),
+    (3, "Data Not Loading", "Data fails to load in application"),
+    (3, "Feature Not Working", "Specific feature not functioning"),
+    (3, "Pricing Question", "Questions about pricing"),
+    (3, "Feature Availability", "Availability of features"),
+    (3, "Service Quality", "Issues with service quality"),
+    (3, "Wait Time", "Complaints about wait times"),
+    (3, "Employee Attitude", "Complaints about employee attitude"),
+]
+
+# Default valid (L1, L2, L3) category combinations
+DEFAULT_COMBINATIONS = [
+    # Account Access combinations
+    ("Account Access", "Login Problem", "Forgotten Password"),
+    ("Account Access", "Login Problem", "Account Verification"),
+    ("Account Access", "Password Reset", "Forgotten Password"),
+    ("Account Access", "Password Reset", "Two-Factor Authentication"),
+    ("Account Access", "Account Locked", "Account Verification"),
+
+    # Billing combinations
+    ("Billing", "Payment Issue", "Payment Declined"),
+    ("Billing", "Billing Error", "Double Charge"),
+    ("Billing", "Refund Request", "Double Charge"),
+    ("Billing", "Billing Error", "Missing Credit"),
+
+    # Technical Issue combinations
+    ("Technical Issue", "App Error", "App Crash"),
+    ("Technical Issue", "App Error", "Data Not Loading"),
+    ("Technical Issue", "System Unavailable", "Feature Not Working"),
+
+    # Product Information combinations
+    ("Product Information", "Feature Question", "Feature Availability"),
+    ("Product Information", "Product Comparison", "Pricing Question"),
+
+    # Complaint combinations
+    ("Complaint", "Service Complaint", "Service Quality"),
+    ("Complaint", "Service Complaint", "Wait Time"),
+    ("Complaint", "Staff Complaint", "Employee Attitude"),
+]
+
+def sql_quote(value: str) -> str:
+    """
+    Render a string as an SQL literal
+    
+    Args:
+        value: String value
+        
+    Returns:
+        SQL literal for the value
+    """
+    return "'" + value.replace("'", "''") + "'"
+
+def build_seed_sql() -> str:
+    """
+    Build INSERT statements for the default categories and combinations
+    
+    Each table's rows are passed as one JSON array literal and expanded by
+    json_each, so SQLite inserts the whole set from a single statement.
+    Rows already present are skipped by their unique keys, so re-running
+    setup only fills in whatever defaults are missing.
+    
+    Returns:
+        SQL script seeding both tables
+    """
+    categories_json = sql_quote(json.dumps(DEFAULT_CATEGORIES))
+    combinations_json = sql_quote(json.dumps(DEFAULT_COMBINATIONS))
+    return f"""
+INSERT OR IGNORE INTO categories (level, name, description)
+SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+FROM json_each({categories_json});
+
+INSERT OR IGNORE INTO valid_combinations (l1_category, l2_category, l3_category)
+SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+FROM json_each({combinations_json});
+"""
+
+# Seed data is static, so render it once at import time
+SEED_SQL = build_seed_sql()
+
 class DatabaseSetup:
     """
     Sets up the database schema for the Call Center Analytics System
@@ -35,6 +359,7 @@ class DatabaseSetup:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._conn = None
         
         # Log whether we're creating a new database or using an existing one
         if not os.path.exists(db_path):
@@ -44,36 +369,41 @@ class DatabaseSetup:
     
     def connect(self) -> sqlite3.Connection:
         """
-        Connect to the database
+        Get the database connection, opening it on first use
         
         Returns:
-            SQLite connection
+            SQLite connection shared by all setup steps
         """
+        if self._conn is not None:
+            return self._conn
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA foreign_keys = ON")
+            conn = sqlite3.connect(f"file:{pathname2url(self.db_path)}?mode=rwc", uri=True)
+
+            # A new, empty database takes the page size from its first write
+            if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+                conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+
+            journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if journal_mode.lower() != "wal":
+                logger.warning(f"Could not enable WAL mode, journal mode is {journal_mode}")
+
+            conn.executescript(CONNECTION_PRAGMAS)
+
+            self._conn = conn
             return conn
         except sqlite3.Error as e:
             logger.error(f"Error connecting to database: {str(e)}")
             raise
     
-    def execute_script(self, conn: sqlite3.Connection, sql_script: str) -> bool:
+    def close(self) -> None:
         """
-        Execute an SQL script
-        
-        Args:
-            conn: Database connection
-            sql_script: SQL script to execute
-            
-        Returns:
-            Success flag
+        Refresh query planner statistics and close the connection
         """
-        try:
-            conn.executescript(sql_script)
-            return True
-        except sqlite3.Error as e:
-            logger.error(f"Error executing SQL script: {str(e)}")
-            return False
+        if self._conn is not None:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+            self._conn = None
     
     def table_exists(self, conn: sqlite3.Connection, table_name: str) -> bool:
         """
@@ -90,406 +420,139 @@ class DatabaseSetup:
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
         return cursor.fetchone() is not None
     
-    def create_tables(self) -> bool:
+    def _index_sql(self, conn: sqlite3.Connection) -> str:
         """
-        Create all tables for the system
+        Build the index statements this database still needs
         
+        Args:
+            conn: Database connection
+            
         Returns:
-            Success flag
+            SQL script creating missing indexes and dropping obsolete ones
         """
-        conn = None
-        try:
-            conn = self.connect()
-            
-            # Define the SQL for creating all tables
-            sql_script = """
-            -- Call transcriptions table
-            CREATE TABLE IF NOT EXISTS call_transcriptions (
-                call_id TEXT PRIMARY KEY,
-                file_name TEXT NOT NULL,
-                file_path TEXT,
-                file_size INTEGER,
-                call_date TEXT,
-                duration_seconds REAL,
-                speaker_count INTEGER,
-                transcription TEXT,
-                import_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                analyzed BOOLEAN DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            
-            -- Analysis results table
-            CREATE TABLE IF NOT EXISTS analysis_results (
-                call_id TEXT PRIMARY KEY,
-                analysis_status TEXT NOT NULL,
-                primary_issue_category TEXT,
-                specific_issue TEXT,
-                issue_severity TEXT,
-                confidence_score REAL,
-                api_error TEXT,
-                issue_summary TEXT,
-                raw_json TEXT,
-                processing_time_ms REAL,
-                model TEXT,
-                call_date TEXT,
-                analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (call_id) REFERENCES call_transcriptions(call_id) ON DELETE CASCADE
-            );
-            
-            -- Categories table
-            CREATE TABLE IF NOT EXISTS categories (
-                category_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                level INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                UNIQUE(level, name)
-            );
-            
-            -- Valid category combinations
-            CREATE TABLE IF NOT EXISTS valid_combinations (
-                combination_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                l1_category TEXT NOT NULL,
-                l2_category TEXT NOT NULL,
-                l3_category TEXT,
-                UNIQUE(l1_category, l2_category, l3_category)
-            );
-            
-            -- Analysis stats table for batch runs
-            CREATE TABLE IF NOT EXISTS analysis_stats (
-                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_date TIMESTAMP NOT NULL,
-                total_processed INTEGER NOT NULL,
-                successful INTEGER NOT NULL,
-                failed INTEGER NOT NULL,
-                avg_confidence REAL,
-                avg_processing_time REAL,
-                model TEXT,
-                batch_size INTEGER,
-                total_tokens INTEGER,
-                total_cost REAL,
-                run_duration_seconds REAL
-            );
-            
-            -- Configuration table
-            CREATE TABLE IF NOT EXISTS config (
-                config_key TEXT PRIMARY KEY,
-                config_value TEXT,
-                value_type TEXT,
-                description TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            
-            -- Users table
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                email TEXT UNIQUE,
-                role TEXT NOT NULL,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            );
-            
-            -- Sessions table
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP,
-                ip_address TEXT,
-                user_agent TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            );
-            
-            -- Audit log table
-            CREATE TABLE IF NOT EXISTS audit_log (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                action TEXT NOT NULL,
-                resource_type TEXT,
-                resource_id TEXT,
-                details TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            );
-            """
-            
-            # Execute the SQL script
-            success = self.execute_script(conn, sql_script)
-            
-            if success:
-                logger.info("Created all tables successfully")
-            else:
-                logger.error("Failed to create tables")
-            
-            return success
-            
-        except Exception as e:
-            logger.error(f"Error creating tables: {str(e)}")
-            return False
-        finally:
-            if conn:
-                conn.close()
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing = {row[0] for row in cursor.fetchall()}
+        
+        statements = [ddl for name, ddl in REQUIRED_INDEXES if name not in existing]
+        statements += [f"DROP INDEX IF EXISTS {name}" for name in OBSOLETE_INDEXES if name in existing]
+        return "".join(f"{statement};\n" for statement in statements)
     
-    def create_indexes(self) -> bool:
+    def _migrate_schema(self, conn: sqlite3.Connection) -> None:
         """
-        Create indexes for better query performance
+        Bring tables created by older versions up to date
         
-        Returns:
-            Success flag
+        Args:
+            conn: Database connection with an open transaction
         """
-        conn = None
-        try:
-            conn = self.connect()
-            
-            # Define the SQL for creating indexes
-            sql_script = """
-            -- Indexes for call_transcriptions
-            CREATE INDEX IF NOT EXISTS idx_call_transcriptions_call_date ON call_transcriptions(call_date);
-            CREATE INDEX IF NOT EXISTS idx_call_transcriptions_analyzed ON call_transcriptions(analyzed);
-            
-            -- Indexes for analysis_results
-            CREATE INDEX IF NOT EXISTS idx_analysis_results_status ON analysis_results(analysis_status);
-            CREATE INDEX IF NOT EXISTS idx_analysis_results_category ON analysis_results(primary_issue_category);
-            CREATE INDEX IF NOT EXISTS idx_analysis_results_severity ON analysis_results(issue_severity);
-            CREATE INDEX IF NOT EXISTS idx_analysis_results_call_date ON analysis_results(call_date);
-            CREATE INDEX IF NOT EXISTS idx_analysis_results_confidence ON analysis_results(confidence_score);
-            
-            -- Indexes for categories
-            CREATE INDEX IF NOT EXISTS idx_categories_level ON categories(level);
-            
-            -- Indexes for valid_combinations
-            CREATE INDEX IF NOT EXISTS idx_valid_combinations_l1 ON valid_combinations(l1_category);
-            CREATE INDEX IF NOT EXISTS idx_valid_combinations_l2 ON valid_combinations(l2_category);
-            
-            -- Indexes for analysis_stats
-            CREATE INDEX IF NOT EXISTS idx_analysis_stats_date ON analysis_stats(run_date);
-            
-            -- Indexes for users
-            CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
-            CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active);
-            
-            -- Indexes for sessions
-            CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id);
-            CREATE INDEX IF NOT EXISTS idx_sessions_active ON sessions(is_active);
-            
-            -- Indexes for audit_log
-            CREATE INDEX IF NOT EXISTS idx_audit_log_user ON audit_log(user_id);
-            CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log(action);
-            CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp);
-            """
-            
-            # Execute the SQL script
-            success = self.execute_script(conn, sql_script)
-            
-            if success:
-                logger.info("Created all indexes successfully")
-            else:
-                logger.error("Failed to create indexes")
-            
-            return success
-            
-        except Exception as e:
-            logger.error(f"Error creating indexes: {str(e)}")
-            return False
-        finally:
-            if conn:
-                conn.close()
+        # Databases created before transcription status tracking need the columns added
+        cursor = conn.execute("PRAGMA table_info(call_transcriptions)")
+        columns = [row[1] for row in cursor.fetchall()]
+        for column in ("transcription_status", "transcription_error"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE call_transcriptions ADD COLUMN {column} TEXT")
+        
+        # Rebuild valid_combinations from the old rowid layout with a synthetic key
+        cursor = conn.execute("PRAGMA table_info(valid_combinations)")
+        if "combination_id" in [row[1] for row in cursor.fetchall()]:
+            conn.execute("ALTER TABLE valid_combinations RENAME TO valid_combinations_old")
+            conn.execute(VALID_COMBINATIONS_SQL)
+            conn.execute(
+                "INSERT OR IGNORE INTO valid_combinations (l1_category, l2_category, l3_category) "
+                "SELECT l1_category, l2_category, COALESCE(l3_category, '') FROM valid_combinations_old"
+            )
+            conn.execute("DROP TABLE valid_combinations_old")
     
-    def create_admin_user(self, username: str, password: str, email: str = None) -> bool:
+    def _create_admin_user(self, conn: sqlite3.Connection, username: str, password: str,
+                           email: str = None) -> None:
         """
         Create an admin user
         
         Args:
+            conn: Database connection with an open transaction
             username: Username for the admin user
             password: Password for the admin user
             email: Email for the admin user
-            
-        Returns:
-            Success flag
         """
-        conn = None
-        try:
-            conn = self.connect()
-            cursor = conn.cursor()
-            
-            # Check if the user already exists
-            cursor.execute("SELECT user_id FROM users WHERE username = ?", (username,))
-            if cursor.fetchone():
-                logger.warning(f"User {username} already exists")
-                return True
-            
-            # Import password hashing function
-            import hashlib
-            
-            # Hash the password (in a real implementation, use a proper password hashing library like bcrypt)
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            
-            # Insert the user
-            cursor.execute(
-                "INSERT INTO users (username, password_hash, email, role) VALUES (?, ?, ?, ?)",
-                (username, password_hash, email, "admin")
-            )
-            
-            conn.commit()
+        # Hash the password with a memory-hard KDF
+        password_hash = hash_password(password)
+        
+        # Insert the user unless the username or email is taken; no row comes
+        # back if either was, so a duplicate admin never aborts the setup
+        row = conn.execute(
+            "INSERT INTO users (username, password_hash, email, role) VALUES (?, ?, ?, 'admin') "
+            "ON CONFLICT DO NOTHING RETURNING user_id",
+            (username, password_hash, email)
+        ).fetchone()
+        
+        if row is None:
+            logger.warning(f"User {username} or email {email} already exists")
+        else:
             logger.info(f"Created admin user {username}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error creating admin user: {str(e)}")
-            if conn:
-                conn.rollback()
-            return False
-        finally:
-            if conn:
-                conn.close()
     
-    def add_default_categories(self) -> bool:
+    def create_admin_user(self, username: str, password: str, email: str = None) -> bool:
         """
-        Add default categories for call classification
+        Create an admin user in its own transaction
         
+        Args:
+            username: Username for the admin user
+            password: Password for the admin user
+            email: Email for the admin user
+            
         Returns:
             Success flag
         """
-        conn = None
         try:
             conn = self.connect()
-            cursor = conn.cursor()
-            
-            # Check if categories already exist
-            cursor.execute("SELECT COUNT(*) FROM categories")
-            if cursor.fetchone()[0] > 0:
-                logger.info("Categories already exist, skipping default categories")
-                return True
-            
-            # Define default categories
-            categories = [
-                # Level 1 categories
-                (1, "Account Access", "Issues related to logging in or accessing accounts"),
-                (1, "Billing", "Issues related to bills, payments, or charges"),
-                (1, "Technical Issue", "Technical problems with systems or applications"),
-                (1, "Product Information", "Questions about products or services"),
-                (1, "Complaint", "Customer complaints about service or experience"),
-                
-                # Level 2 categories
-                (2, "Login Problem", "Problems logging into accounts"),
-                (2, "Password Reset", "Assistance with password resets"),
-                (2, "Account Locked", "Account is locked due to security reasons"),
-                (2, "Payment Issue", "Problems with payments"),
-                (2, "Billing Error", "Errors on bills or statements"),
-                (2, "Refund Request", "Requests for refunds"),
-                (2, "App Error", "Errors in mobile or web applications"),
-                (2, "System Unavailable", "Systems that are down or unreachable"),
-                (2, "Feature Question", "Questions about specific features"),
-                (2, "Product Comparison", "Comparing different products or plans"),
-                (2, "Service Complaint", "Complaints about service quality"),
-                (2, "Staff Complaint", "Complaints about staff behavior"),
-                
-                # Level 3 categories
-                (3, "Forgotten Password", "User has forgotten their password"),
-                (3, "Account Verification", "Issues verifying account identity"),
-                (3, "Two-Factor Authentication", "Issues with 2FA"),
-                (3, "Payment Declined", "Payment method was declined"),
-                (3, "Double Charge", "Customer was charged twice"),
-                (3, "Missing Credit", "Credit not applied to account"),
-                (3, "App Crash", "Application crashes or freezes"),
-                (3, "Data Not Loading", "Data fails to load in application"),
-                (3, "Feature Not Working", "Specific feature not functioning"),
-                (3, "Pricing Question", "Questions about pricing"),
-                (3, "Feature Availability", "Availability of features"),
-                (3, "Service Quality", "Issues with service quality"),
-                (3, "Wait Time", "Complaints about wait times"),
-                (3, "Employee Attitude", "Complaints about employee attitude"),
-            ]
-            
-            # Insert categories
-            for level, name, description in categories:
-                cursor.execute(
-                    "INSERT INTO categories (level, name, description) VALUES (?, ?, ?)",
-                    (level, name, description)
-                )
-            
-            # Define valid combinations
-            combinations = [
-                # Account Access combinations
-                ("Account Access", "Login Problem", "Forgotten Password"),
-                ("Account Access", "Login Problem", "Account Verification"),
-                ("Account Access", "Password Reset", "Forgotten Password"),
-                ("Account Access", "Password Reset", "Two-Factor Authentication"),
-                ("Account Access", "Account Locked", "Account Verification"),
-                
-                # Billing combinations
-                ("Billing", "Payment Issue", "Payment Declined"),
-                ("Billing", "Billing Error", "Double Charge"),
-                ("Billing", "Refund Request", "Double Charge"),
-                ("Billing", "Billing Error", "Missing Credit"),
-                
-                # Technical Issue combinations
-                ("Technical Issue", "App Error", "App Crash"),
-                ("Technical Issue", "App Error", "Data Not Loading"),
-                ("Technical Issue", "System Unavailable", "Feature Not Working"),
-                
-                # Product Information combinations
-                ("Product Information", "Feature Question", "Feature Availability"),
-                ("Product Information", "Product Comparison", "Pricing Question"),
-                
-                # Complaint combinations
-                ("Complaint", "Service Complaint", "Service Quality"),
-                ("Complaint", "Service Complaint", "Wait Time"),
-                ("Complaint", "Staff Complaint", "Employee Attitude"),
-            ]
-            
-            # Insert valid combinations
-            for l1, l2, l3 in combinations:
-                cursor.execute(
-                    "INSERT INTO valid_combinations (l1_category, l2_category, l3_category) VALUES (?, ?, ?)",
-                    (l1, l2, l3)
-                )
-            
-            conn.commit()
-            logger.info(f"Added {len(categories)} default categories and {len(combinations)} valid combinations")
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._create_admin_user(conn, username, password, email)
             return True
             
         except Exception as e:
-            logger.error(f"Error adding default categories: {str(e)}")
-            if conn:
-                conn.rollback()
+            logger.error(f"Error creating admin user: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
     
-    def setup(self, create_admin: bool = True, add_categories: bool = True) -> bool:
+    def setup(self, create_admin: bool = True, add_categories: bool = True,
+              admin_username: str = "admin", admin_password: str = "admin123",
+              admin_email: str = "admin@example.com") -> bool:
         """
         Set up the database
         
+        The schema, any missing indexes and the seed data run as one SQL
+        script on a single connection. Everything, including the admin user,
+        is committed as one transaction, so a failure in any step leaves the
+        database untouched. An admin whose username or email is already taken
+        is skipped with a warning rather than treated as a failure.
+        
         Args:
             create_admin: Whether to create an admin user
             add_categories: Whether to add default categories
+            admin_username: Username for the admin user
+            admin_password: Password for the admin user
+            admin_email: Email for the admin user
             
         Returns:
             Success flag
         """
         try:
-            # Step 1: Create tables
-            if not self.create_tables():
-                return False
-            
-            # Step 2: Create indexes
-            if not self.create_indexes():
-                return False
-            
-            # Step 3: Create admin user if requested
-            if create_admin:
-                if not self.create_admin_user("admin", "admin123", "admin@example.com"):
-                    logger.warning("Failed to create admin user")
-            
-            # Step 4: Add default categories if requested
-            if add_categories:
-                if not self.add_default_categories():
-                    logger.warning("Failed to add default categories")
+            conn = self.connect()
+            with conn:
+                # executescript commits any pending transaction before it runs, so
+                # the transaction is opened by the script itself and left open.
+                # The index statements keep IF NOT EXISTS in case another
+                # process adds an index between the lookup and BEGIN.
+                sql_script = "BEGIN IMMEDIATE;\n" + SCHEMA_SQL + self._index_sql(conn)
+                if add_categories:
+                    sql_script += SEED_SQL
+                sql_script += "ANALYZE;\n"
+                conn.executescript(sql_script)
+                logger.info("Created all tables and indexes successfully")
+                
+                self._migrate_schema(conn)
+                
+                # The admin password hash is salted per run, so it cannot be part of the script
+                if create_admin:
+                    self._create_admin_user(conn, admin_username, admin_password, admin_email)
             
             logger.info("Database setup completed successfully")
             return True
@@ -507,30 +570,37 @@ def main():
     parser.add_argument("--admin-username", default="admin", help="Admin username")
     parser.add_argument("--admin-password", default="admin123", help="Admin password")
     parser.add_argument("--admin-email", default="admin@example.com", help="Admin email")
+    parser.add_argument("--log-file", action="store_true", help=f"Also write logs to {LOG_FILE}")
     
     args = parser.parse_args()
     
+    log_listener = _configure_logging(to_file=args.log_file)
+    
     # Create database setup
     db_setup = DatabaseSetup(args.db_path)
     
-    # Set up the database
-    success = db_setup.setup(
-        create_admin=not args.no_admin,
-        add_categories=not args.no_categories
-    )
-    
-    # If admin user creation is enabled but failed, try again with custom credentials
-    if not args.no_admin and success and not db_setup.create_admin_user(
-        args.admin_username, args.admin_password, args.admin_email
-    ):
-        logger.warning("Failed to create admin user with custom credentials")
+    try:
+        # Set up the database
+        success = db_setup.setup(
+            create_admin=not args.no_admin,
+            add_categories=not args.no_categories,
+            admin_username=args.admin_username,
+            admin_password=args.admin_password,
+            admin_email=args.admin_email
+        )
+    finally:
+        db_setup.close()
     
     if success:
         logger.info("Database setup completed successfully")
-        return 0
+        exit_code = 0
     else:
         logger.error("Database setup failed")
-        return 1
+        exit_code = 1
+    
+    if log_listener:
+        log_listener.stop()
+    return exit_code
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
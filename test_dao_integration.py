@@ -6,13 +6,24 @@ This script tests the integration between the DAO layer and business logic.
 
 import os
 import sys
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
 import asyncio
 from pprint import pprint
-import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 import json
 
+try:
+    import orjson
+except ImportError:
+    # Only used to pre-serialize config payloads; json.dumps produces the same values
+    orjson = None
+
 # Import Database Layer
 from dao.base_dao import BaseDAO
 from dao.transcription_dao import TranscriptionDAO
@@ -21,19 +32,29 @@ from dao.category_dao import CategoryDAO
 from dao.stats_dao import StatsDAO
 from dao.config_dao import ConfigDAO
 from dao.user_dao import UserDAO
+from dao.db_connection_pool import get_connection_pool
 
 # Import Configuration manager
 from config_manager import config
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("test_integration.log"),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging. Records are only queued on the calling thread; a listener
+# thread formats them and does the file and console writes.
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler("test_integration.log", delay=True),
+    logging.StreamHandler()
+]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 logger = logging.getLogger(__name__)
 
 class TestIntegration:
@@ -46,6 +67,9 @@ class TestIntegration:
         self.db_path = db_path or config.get("db_path")
         logger.info(f"Using database: {self.db_path}")
         
+        # The DAOs share one pool; open enough connections for the concurrent tests
+        get_connection_pool(self.db_path).prewarm(4)
+        
         # Initialize DAOs
         self.transcription_dao = TranscriptionDAO(self.db_path)
         self.analysis_dao = AnalysisResultDAO(self.db_path)
@@ -58,30 +82,49 @@ class TestIntegration:
         """Load sample data for testing"""
         logger.info("Setting up test data...")
         
-        # Check if we have sample data in CSV files
+        # Each step writes different tables through its own pooled connection,
+        # so CSV parsing in one step overlaps with database writes in another
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(self._import_transcriptions),
+                executor.submit(self._import_categories),
+                executor.submit(self._seed_configs),
+                executor.submit(self._ensure_test_user),
+            ]
+            for future in futures:
+                future.result()
+    
+    def _import_transcriptions(self):
+        """Import sample transcriptions if the CSV file is present"""
         transcription_csv = "call_transcriptions.csv"
-        categories_csv = "categories.csv"
         
         if os.path.exists(transcription_csv):
-            count = self.transcription_dao.import_from_csv(transcription_csv)
+            count = self.transcription_dao.import_csv_bulk(transcription_csv)
             logger.info(f"Imported {count} transcriptions from {transcription_csv}")
         else:
             logger.warning(f"Sample transcription file {transcription_csv} not found")
+    
+    def _import_categories(self):
+        """Import sample categories if the CSV file is present"""
+        categories_csv = "categories.csv"
         
         if os.path.exists(categories_csv):
             cat_count, comb_count = self.category_dao.import_categories_from_csv(categories_csv)
             logger.info(f"Imported {cat_count} categories and {comb_count} valid combinations from {categories_csv}")
         else:
             logger.warning(f"Sample categories file {categories_csv} not found")
-        
-        # Set test configurations
-        self.config_dao.save_config("test_mode", True, "Flag for test mode")
-        self.config_dao.save_config("openai_model", "gpt-4-turbo", "OpenAI model to use")
-        
-        # Create test user if not exists
+    
+    def _seed_configs(self):
+        """Set test configurations"""
+        self.config_dao.save_configs([
+            ("test_mode", True, "Flag for test mode"),
+            ("openai_model", "gpt-4-turbo", "OpenAI model to use"),
+        ])
+    
+    def _ensure_test_user(self):
+        """Create test user if not exists"""
         try:
-            users = self.user_dao.get_active_users()
-            if not any(u.get('username') == 'test_analyst' for u in users):
+            if not self.user_dao.username_exists("test_analyst"):
                 user_id = self.user_dao.create_user(
                     username="test_analyst",
                     password="test_password",
@@ -96,25 +139,26 @@ class TestIntegration:
         """Test transcription workflow"""
         logger.info("Testing transcription workflow...")
         
-        # Get sample transcriptions
-        transcriptions = self.transcription_dao.get_all(limit=5)
-        if not transcriptions:
+        # Count in SQL rather than materializing rows just to take their length
+        total = self.transcription_dao.count_all()
+        if not total:
             logger.warning("No transcriptions found in database")
             return False
         
-        logger.info(f"Found {len(transcriptions)} transcriptions")
-        for t in transcriptions[:2]:  # Show first two as examples
-            logger.info(f"Sample transcription: {t.get('call_id')} - {t.get('file_name')}")
-            # Truncate transcription for display
-            text = t.get('transcription', '')
+        logger.info(f"Found {total} transcriptions")
+        samples = self.transcription_dao.iter_all(limit=2)
+        for t in samples:  # Show first two as examples
+            logger.info("Sample transcription: %s - %s", t['call_id'], t['file_name'])
+            # Truncate transcription for display; %.100s only formats if the record is emitted
+            text = t['transcription']
             if text:
-                logger.info(f"Preview: {text[:100]}...")
+                logger.info("Preview: %.100s...", text)
         
         # Get transcriptions for analysis
         to_analyze = self.transcription_dao.get_for_analysis(limit=5)
         logger.info(f"Found {len(to_analyze)} transcriptions to analyze")
         
-        return len(transcriptions) > 0
+        return total > 0
     
     def test_category_validation(self):
         """Test category validation logic"""
@@ -128,7 +172,7 @@ class TestIntegration:
         
         # Print category counts by level
         for level, cats in categories.items():
-            logger.info(f"{level}: {len(cats)} categories")
+            logger.info("%s: %d categories", level, len(cats))
         
         # Get valid combinations
         combinations = self.category_dao.get_valid_combinations()
@@ -164,7 +208,7 @@ class TestIntegration:
         
         # Create a sample analysis result
         sample_result = {
-            "call_id": f"test_call_{int(pd.Timestamp.now().timestamp())}",
+            "call_id": f"test_call_{int(time.time())}",
             "analysis_status": "completed",
             "primary_issue_category": "Account Access",
             "specific_issue": "Password Reset",
@@ -192,7 +236,7 @@ class TestIntegration:
         logger.info(f"Analysis statistics: {len(stats)} metrics found")
         for key, value in stats.items():
             if not isinstance(value, (list, dict)):
-                logger.info(f"Stat: {key} = {value}")
+                logger.info("Stat: %s = %s", key, value)
         
         return success and result is not None
     
@@ -210,27 +254,41 @@ class TestIntegration:
             "dict_config": {"key1": "value1", "key2": "value2"}
         }
         
-        # Save all configs
-        for key, value in configs.items():
-            self.config_dao.save_config(key, value, f"Test {key}")
+        # Scalars go through the typed path so each data type tag is round-tripped;
+        # containers are serialized once up front and stored as raw JSON payloads
+        dumps = orjson.dumps if orjson is not None else json.dumps
+        typed = [(key, value, f"Test {key}") for key, value in configs.items() if not isinstance(value, (list, dict))]
+        payloads = [
+            (key, dumps(value), "json", f"Test {key}")
+            for key, value in configs.items() if isinstance(value, (list, dict))
+        ]
+        self.config_dao.save_configs(typed)
+        self.config_dao.save_configs_raw(payloads)
         
         # Get all configs
         all_configs = self.config_dao.get_all_configs()
         logger.info(f"Retrieved {len(all_configs)} configurations")
         
         # Check if we can retrieve each config with correct type
+        try:
+            actual_configs = self.config_dao.get_configs(list(configs))
+        except Exception as e:
+            logger.error(f"Error retrieving configs: {str(e)}")
+            return False
+        
+        expected_types = {key: type(value) for key, value in configs.items()}
+        
         all_correct = True
         for key, expected_value in configs.items():
             try:
-                actual_value = self.config_dao.get_config(key)
-                correct_type = type(actual_value) == type(expected_value)
-                correct_value = actual_value == expected_value
+                actual_value = actual_configs[key]
                 
-                if not (correct_type and correct_value):
+                # Compare types first so mismatched containers are never compared deeply
+                if type(actual_value) is not expected_types[key] or actual_value != expected_value:
                     all_correct = False
-                    logger.error(f"Config mismatch for {key}: expected {expected_value} ({type(expected_value).__name__}), got {actual_value} ({type(actual_value).__name__})")
+                    logger.error(f"Config mismatch for {key}: expected {expected_value} ({expected_types[key].__name__}), got {actual_value} ({type(actual_value).__name__})")
                 else:
-                    logger.info(f"Config {key}: {actual_value} ({type(actual_value).__name__}) - Correct")
+                    logger.info("Config %s: %s (%s) - Correct", key, actual_value, type(actual_value).__name__)
             except Exception as e:
                 all_correct = False
                 logger.error(f"Error retrieving config {key}: {str(e)}")
@@ -289,7 +347,7 @@ class TestIntegration:
         
         # Create sample stats
         stats = {
-            "run_date": pd.Timestamp.now().isoformat(),
+            "run_date": datetime.now().isoformat(),
             "total_processed": 100,
             "successful": 90,
             "failed": 10,
@@ -314,7 +372,7 @@ class TestIntegration:
         logger.info(f"Summary stats: {len(summary)} metrics")
         for key, value in summary.items():
             if not isinstance(value, (list, dict)):
-                logger.info(f"Summary: {key} = {value}")
+                logger.info("Summary: %s = %s", key, value)
         
         # Get performance stats
         perf = self.stats_dao.get_performance_stats(days=30)
@@ -322,29 +380,33 @@ class TestIntegration:
         
         return saved and len(runs) > 0
     
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all integration tests"""
         logger.info("Starting integration tests...")
         
         # Setup
-        self.setup_test_data()
-        
-        # Run tests
-        test_results = {
-            "transcription_workflow": self.test_transcription_workflow(),
-            "category_validation": self.test_category_validation(),
-            "analysis_operations": self.test_analysis_operations(),
-            "config_operations": self.test_config_operations(),
-            "user_operations": self.test_user_operations(),
-            "stats_operations": self.test_stats_operations(),
+        await asyncio.to_thread(self.setup_test_data)
+        
+        # The tests are independent and block on SQLite I/O, so run them in
+        # worker threads. The transcription and analysis DAOs open a connection
+        # per call, and the BaseDAO ones check out their own pooled connection.
+        tests = {
+            "transcription_workflow": self.test_transcription_workflow,
+            "category_validation": self.test_category_validation,
+            "analysis_operations": self.test_analysis_operations,
+            "config_operations": self.test_config_operations,
+            "user_operations": self.test_user_operations,
+            "stats_operations": self.test_stats_operations,
         }
+        results = await asyncio.gather(*(asyncio.to_thread(test) for test in tests.values()))
+        test_results = dict(zip(tests, results))
         
         # Report results
         logger.info("Test Results:")
         all_passed = True
         for test, result in test_results.items():
             status = "PASSED" if result else "FAILED"
-            logger.info(f"  {test}: {status}")
+            logger.info("  %s: %s", test, status)
             if not result:
                 all_passed = False
         
@@ -358,7 +420,7 @@ class TestIntegration:
 if __name__ == "__main__":
     # Run the integration tests
     tester = TestIntegration()
-    success = tester.run_all_tests()
+    success = asyncio.run(tester.run_all_tests())
     
     # Exit with appropriate code
     sys.exit(0 if success else 1) 
\ No newline at end of file
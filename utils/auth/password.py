@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Utilities
+Provides the password hash format shared by database setup and user management.
+"""
+
+import os
+import hmac
+import hashlib
+
+# scrypt work factor for password hashes (n=2^15, r=8 needs 32 MiB plus headroom)
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+def _derive_key(password: str, salt: bytes) -> bytes:
+    """Derive the scrypt key for a password and salt"""
+    return hashlib.scrypt(
+        password.encode('utf-8'), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+        maxmem=SCRYPT_MAXMEM, dklen=KEY_BYTES
+    )
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with scrypt and a random salt
+    
+    Args:
+        password: Password to hash
+    
+    Returns:
+        Salt and derived key as "salt_hex:key_hex"
+    """
+    salt = os.urandom(SALT_BYTES)
+    return f"{salt.hex()}:{_derive_key(password, salt).hex()}"
+
+def is_scrypt_hash(password_hash: str) -> bool:
+    """
+    Check whether a stored hash is in the format produced by hash_password
+    
+    Args:
+        password_hash: Stored password hash
+    
+    Returns:
+        True for "salt_hex:key_hex" hashes, False otherwise
+    """
+    return ':' in password_hash
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """
+    Check a password against a hash produced by hash_password
+    
+    Args:
+        password: Password to check (plaintext)
+        password_hash: Stored hash as "salt_hex:key_hex"
+    
+    Returns:
+        True if the password matches, False otherwise (including malformed hashes)
+    """
+    salt_hex, _, key_hex = password_hash.partition(':')
+    try:
+        salt = bytes.fromhex(salt_hex)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_derive_key(password, salt).hex(), key_hex)
@@ -65,31 +65,33 @@ def retry(max_attempts: int = 3, delay: int = 1, backoff: float = 2.0,
     Returns:
         Decorated function
     """
+    log = logger_func or logger.warning
+    
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            mtries, mdelay = max_attempts, delay
+            # Fast path: most calls succeed first time and never enter the retry loop
+            try:
+                return func(*args, **kwargs)
+            except exceptions as e:
+                log(f"Retry attempt 1/{max_attempts} for {func.__name__}: {str(e)}")
+                if max_attempts <= 1:
+                    raise
             
-            # Try the function up to max_attempts times
-            for attempt in range(1, mtries + 1):
+            mdelay = delay
+            for attempt in range(2, max_attempts + 1):
+                # Wait before next attempt, increasing the delay each time
+                time.sleep(mdelay)
+                mdelay *= backoff
+                
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    # Log the error
-                    if logger_func:
-                        logger_func(f"Retry attempt {attempt}/{max_attempts} for {func.__name__}: {str(e)}")
-                    else:
-                        logger.warning(f"Retry attempt {attempt}/{max_attempts} for {func.__name__}: {str(e)}")
+                    log(f"Retry attempt {attempt}/{max_attempts} for {func.__name__}: {str(e)}")
                     
                     # Last attempt failed, raise exception
-                    if attempt == mtries:
+                    if attempt == max_attempts:
                         raise
-                    
-                    # Wait before next attempt
-                    time.sleep(mdelay)
-                    
-                    # Increase the delay for next attempt
-                    mdelay *= backoff
         return wrapper
     return decorator
 
@@ -170,17 +172,20 @@ def exception_mapper(exception_map: Dict[Type[Exception], Type[Exception]]):
     Returns:
         Decorated function
     """
+    # Built once so unmapped exceptions pass straight through a single tuple match
+    source_exceptions = tuple(exception_map)
+    mappings = tuple(exception_map.items())
+    
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
-            except Exception as e:
-                # Check if this exception type should be remapped
-                for source_exception, target_exception in exception_map.items():
+            except source_exceptions as e:
+                # Remap using the first matching entry, in mapping order
+                for source_exception, target_exception in mappings:
                     if isinstance(e, source_exception):
                         raise target_exception(str(e)) from e
-                # If no mapping found, re-raise the original exception
                 raise
         return wrapper
     return decorator 
\ No newline at end of file
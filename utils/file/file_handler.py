@@ -5,7 +5,8 @@ Provides standardized file operations.
 """
 
 import os
-import glob
+import math
+import stat
 import logging
 import shutil
 import json
@@ -13,9 +14,42 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; reflink copies are skipped there
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    # Speeds up load_json/save_json when installed; both fall back to json
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Linux ioctl request that clones (reflinks) one file's extents into another
+FICLONE = 0x40049409
+
+def _non_finite_to_none(data: Any) -> Any:
+    """
+    Replace NaN and infinite floats with None, as orjson does when encoding
+    
+    Args:
+        data: JSON-serializable data
+        
+    Returns:
+        Copy of the data with non-finite floats replaced
+    """
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _non_finite_to_none(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_non_finite_to_none(value) for value in data]
+    return data
+
 class FileHandler:
     """Utilities for handling files"""
     
@@ -52,39 +86,88 @@ class FileHandler:
             List of file paths
         """
         try:
-            if not os.path.exists(directory_path):
-                logger.warning(f"Directory not found: {directory_path}")
-                return []
-            
-            files = []
-            for ext in extensions:
-                # Ensure extension starts with a dot
-                if not ext.startswith('.'):
-                    ext = f'.{ext}'
-                    
-                files.extend(glob.glob(os.path.join(directory_path, f"*{ext}")))
+            # Normalise extensions to lower case with a leading dot; matching on the
+            # whole suffix keeps multi-part extensions such as '.tar.gz' working
+            suffixes = tuple({'.' + ext.lstrip('.').lower() for ext in extensions})
+            
+            # One directory listing for all extensions; hidden files are skipped as glob would
+            with os.scandir(directory_path) as entries:
+                files = [
+                    entry.path for entry in entries
+                    if not entry.name.startswith('.')
+                    and entry.is_file()
+                    and entry.name.lower().endswith(suffixes)
+                ]
             
             logger.info(f"Found {len(files)} files with extensions {extensions} in {directory_path}")
             return files
+        except FileNotFoundError:
+            logger.warning(f"Directory not found: {directory_path}")
+            return []
         except Exception as e:
             logger.error(f"Error finding files in {directory_path}: {str(e)}")
             return []
     
     @staticmethod
-    def create_backup(file_path: str, backup_dir: Optional[str] = None) -> Optional[str]:
+    def _copy_file(src_path: str, dst_path: str) -> None:
+        """
+        Copy file contents, letting the kernel do the work where it can
+        
+        Tries copy_file_range (an in-kernel copy, which XFS and Btrfs turn into
+        a reflink), then a FICLONE reflink, then shutil.copyfile, which uses
+        sendfile on Linux. Metadata is not copied.
+        
+        Args:
+            src_path: File to copy
+            dst_path: Destination path, overwritten if it exists
+        """
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            
+            if hasattr(os, 'copy_file_range'):
+                try:
+                    remaining = os.fstat(src_fd).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                    if remaining == 0:
+                        return
+                except OSError:
+                    pass
+            
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+                    return
+                except OSError:
+                    pass
+        
+        shutil.copyfile(src_path, dst_path)
+    
+    @staticmethod
+    def create_backup(file_path: str, backup_dir: Optional[str] = None,
+                      missing_ok: bool = False) -> Optional[str]:
         """
         Create a backup of a file
         
         Args:
             file_path: Path to the file to backup
             backup_dir: Optional directory for backups, defaults to a 'backups' folder in the same directory
+            missing_ok: Treat a missing file as nothing to back up and log it at debug level
             
         Returns:
             Path to backup file or None if backup failed
         """
         try:
-            if not os.path.exists(file_path):
-                logger.warning(f"File not found, cannot create backup: {file_path}")
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                if missing_ok:
+                    logger.debug(f"No existing file to back up: {file_path}")
+                else:
+                    logger.warning(f"File not found, cannot create backup: {file_path}")
                 return None
                 
             # Create timestamp for unique backup filename
@@ -103,8 +186,11 @@ class FileHandler:
             backup_filename = f"{base_name}_{timestamp}{extension}"
             backup_path = os.path.join(backup_dir, backup_filename)
             
-            # Copy file to backup location
-            shutil.copy2(file_path, backup_path)
+            # Copy file to backup location, keeping timestamps and permissions
+            # from the stat taken above rather than stat-ing the source again
+            FileHandler._copy_file(file_path, backup_path)
+            os.chmod(backup_path, stat.S_IMODE(file_stat.st_mode))
+            os.utime(backup_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
             logger.info(f"Created backup of {file_path} at {backup_path}")
             
             return backup_path
@@ -113,34 +199,42 @@ class FileHandler:
             return None
     
     @staticmethod
-    def safe_write_csv(df: pd.DataFrame, file_path: str, create_backup: bool = True) -> bool:
+    def safe_write_csv(df: pd.DataFrame, file_path: str, create_backup: bool = True,
+                       chunksize: int = 50_000) -> bool:
         """
         Safely write DataFrame to CSV with backup
         
+        Large frames are written in slices of chunksize rows, so only one
+        slice is formatted in memory at a time.
+        
         Args:
             df: DataFrame to write
             file_path: Path to output file
             create_backup: Whether to create backup of existing file
+            chunksize: Maximum number of rows formatted per write
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Create backup if file exists and backup is requested
-            if os.path.exists(file_path) and create_backup:
-                FileHandler.create_backup(file_path)
+            # Back up the existing file, if there is one
+            if create_backup:
+                FileHandler.create_backup(file_path, missing_ok=True)
             
             # Create temporary file
             temp_file = f"{file_path}.temp"
             
             # Write to temporary file first
-            df.to_csv(temp_file, index=False)
-            
-            # Rename temporary file to final name (atomic operation)
-            if os.path.exists(file_path):
-                os.replace(temp_file, file_path)
+            if len(df) > chunksize:
+                with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+                    df.iloc[:0].to_csv(f, index=False)
+                    for start in range(0, len(df), chunksize):
+                        df.iloc[start:start + chunksize].to_csv(f, header=False, index=False)
             else:
-                os.rename(temp_file, file_path)
+                df.to_csv(temp_file, index=False)
+            
+            # Rename temporary file to final name (atomic, whether or not it exists)
+            os.replace(temp_file, file_path)
                 
             logger.info(f"Successfully wrote DataFrame with {len(df)} records to {file_path}")
             return True
@@ -173,8 +267,17 @@ class FileHandler:
                 logger.warning(f"JSON file not found: {file_path}")
                 return None
                 
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
+            if orjson is not None:
+                with open(file_path, 'rb') as file:
+                    raw = file.read()
+                try:
+                    data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    # orjson is strict JSON; files holding NaN/Infinity need the json module
+                    data = json.loads(raw)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
                 
             logger.info(f"Successfully loaded JSON from {file_path}")
             return data
@@ -187,6 +290,9 @@ class FileHandler:
         """
         Save data to JSON file
         
+        NaN and infinite floats (common in pandas-derived data) are written as null,
+        since standard JSON cannot represent them.
+        
         Args:
             data: Data to save
             file_path: Path to output file
@@ -200,11 +306,21 @@ class FileHandler:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
             # Write JSON to file
-            with open(file_path, 'w', encoding='utf-8') as file:
+            if orjson is not None:
+                option = orjson.OPT_NON_STR_KEYS
                 if pretty:
-                    json.dump(data, file, indent=2, ensure_ascii=False)
-                else:
-                    json.dump(data, file, ensure_ascii=False)
+                    option |= orjson.OPT_INDENT_2
+                with open(file_path, 'wb') as file:
+                    file.write(orjson.dumps(data, option=option))
+            else:
+                indent = 2 if pretty else None
+                try:
+                    text = json.dumps(data, indent=indent, ensure_ascii=False, allow_nan=False)
+                except ValueError:
+                    # Match orjson's output instead of writing NaN/Infinity tokens
+                    text = json.dumps(_non_finite_to_none(data), indent=indent, ensure_ascii=False)
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    file.write(text)
                     
             logger.info(f"Successfully saved JSON to {file_path}")
             return True
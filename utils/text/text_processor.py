@@ -5,142 +5,308 @@ Provides functions for text manipulation and extraction.
 """
 
 import re
-import logging
-from typing import List, Optional
-from functools import lru_cache
+import sys
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from functools import cache, lru_cache
 
-# Configure logging
-logger = logging.getLogger(__name__)
+try:
+    import re2
+except ImportError:
+    # Gives linear-time phone and date matching when installed; see _compile_linear
+    re2 = None
 
-class TextProcessor:
-    """Utilities for processing text data"""
+def _compile_linear(pattern: str):
+    """
+    Compile a pattern with RE2 when it is installed, falling back to re
     
-    @staticmethod
-    def chunk_text(text: str, max_length: int = 8000) -> List[str]:
-        """
-        Split long text into chunks for API processing
+    RE2 matches in linear time, so long digit runs cannot trigger backtracking.
+    
+    Args:
+        pattern: Regular expression to compile
         
-        Args:
-            text: Text to chunk
-            max_length: Maximum length for each chunk
-            
-        Returns:
-            List of text chunks
-        """
-        if not text or len(text) <= max_length:
-            return [text] if text else []
+    Returns:
+        Compiled pattern object
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+# A sentence ends at one of these marks when whitespace follows it. They are single
+# bytes in UTF-8, so encoded text can be searched for them directly.
+_SENTENCE_MARKS = ('.', '!', '?')
+_SENTENCE_MARK_BYTES = tuple(mark.encode('ascii') for mark in _SENTENCE_MARKS)
+
+# Patterns are compiled once here rather than looked up in re's cache on every call.
+
+# Common date patterns in filenames, as one alternation so the name is scanned once
+_DATE_RE = _compile_linear(
+    r'(?P<ymd>\d{4}[-_/]\d{1,2}[-_/]\d{1,2})'  # YYYY-MM-DD, YYYY/MM/DD, YYYY_MM_DD
+    r'|(?P<mdy>\d{1,2}[-_/]\d{1,2}[-_/]\d{4})'  # MM-DD-YYYY, MM/DD/YYYY, MM_DD_YYYY
+    r'|(?P<ymd8>\d{8})'  # YYYYMMDD
+)
+
+# Look for patterns like +91XXXXXXXXXX or 0XXXXXXXXXX in a single scan. The leftmost
+# number wins; at the same position, the country-code form is tried first.
+_PHONE_RE = _compile_linear(
+    r'\+\d{2}\s?\d{10}'  # +91XXXXXXXXXX or +91 XXXXXXXXXX
+    r'|\d{3}[-\s]?\d{3}[-\s]?\d{4}'  # XXXXXXXXXX, XXX-XXX-XXXX or XXX XXX XXXX
+)
+
+# \d and \s match the same characters in ASCII text with or without re.ASCII, and the
+# ASCII-only pattern scans faster. RE2 already works on UTF-8 bytes, so this is for re only.
+_ASCII_PHONE_RE = None if re2 is not None else re.compile(_PHONE_RE.pattern, re.ASCII)
+
+# Longer texts are always chunked afresh so the chunk cache never pins large transcripts
+_CHUNK_CACHE_MAX_TEXT = 32 * 1024
+
+def _last_sentence_end(text: Union[str, bytes], marks: tuple, start: int, end: int) -> int:
+    """
+    Find the last sentence ending whose mark lies in text[start:end]
+    
+    Args:
+        text: Text, or UTF-8 encoded text, to search
+        marks: Sentence-ending marks of the same type as text
+        start: Offset to search from
+        end: Offset to search up to (exclusive)
         
-        # Split by sentence endings
-        sentence_endings = r'(?<=[.!?])\s+'
-        sentences = re.split(sentence_endings, text)
+    Returns:
+        Offset just past the sentence-ending mark, or -1 if there is none
+    """
+    positions = [text.rfind(mark, start, end) for mark in marks]
+    while True:
+        index = max(positions)
+        if index < 0:
+            return -1
+        if text[index + 1:index + 2].isspace():
+            return index + 1
+        # Not followed by whitespace (e.g. "3.14"), so look further back for that mark
+        slot = positions.index(index)
+        positions[slot] = text.rfind(marks[slot], start, index)
+
+def _next_sentence_end(text: Union[str, bytes], marks: tuple, start: int) -> int:
+    """
+    Find the first sentence ending whose mark lies at or after start
+    
+    Args:
+        text: Text, or UTF-8 encoded text, to search
+        marks: Sentence-ending marks of the same type as text
+        start: Offset to search from
         
-        chunks = []
-        current_chunk = []
-        current_length = 0
+    Returns:
+        Offset just past the sentence-ending mark, or -1 if there is none
+    """
+    positions = [text.find(mark, start) for mark in marks]
+    while True:
+        found = [index for index in positions if index >= 0]
+        if not found:
+            return -1
+        index = min(found)
+        if text[index + 1:index + 2].isspace():
+            return index + 1
+        slot = positions.index(index)
+        positions[slot] = text.find(marks[slot], index + 1)
+
+def _chunk_spans(text: Union[str, bytes], max_length: int) -> Iterator[Tuple[int, int]]:
+    """
+    Find the (start, end) offsets of each chunk of text
+    
+    Chunks break at sentence endings and are at most max_length long (characters
+    for str, bytes for encoded text), unless a single sentence is longer than that.
+    
+    Args:
+        text: Text, or UTF-8 encoded text, to chunk
+        max_length: Maximum length for each chunk
         
-        for sentence in sentences:
-            sentence_length = len(sentence)
-            
-            if current_length + sentence_length + 1 <= max_length:
-                current_chunk.append(sentence)
-                current_length += sentence_length + 1  # +1 for space
-            else:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
-                current_chunk = [sentence]
-                current_length = sentence_length
+    Yields:
+        (start, end) offsets into text
+    """
+    marks = _SENTENCE_MARKS if isinstance(text, str) else _SENTENCE_MARK_BYTES
+    text_end = len(text.rstrip())
+    chunk_start = 0  # Offset where the current chunk begins
+    
+    # Jump straight to the last sentence ending that fits, instead of visiting every sentence
+    while text_end - chunk_start > max_length:
+        chunk_limit = chunk_start + max_length  # Furthest offset the current chunk may reach
+        chunk_end = _last_sentence_end(text, marks, chunk_start, chunk_limit)
+        if chunk_end < 0:
+            # The first sentence alone is too long; keep it whole as its own chunk
+            chunk_end = _next_sentence_end(text, marks, chunk_limit)
+            if chunk_end < 0:
+                break
         
-        # Add the last chunk
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        yield chunk_start, chunk_end
         
-        return chunks
+        # The next chunk starts after the whitespace that follows the sentence ending
+        chunk_start = chunk_end
+        while chunk_start < text_end and text[chunk_start:chunk_start + 1].isspace():
+            chunk_start += 1
+    
+    # Add the last chunk
+    if text_end > chunk_start:
+        yield chunk_start, text_end
+
+def iter_chunks(text: str, max_length: int = 8000) -> Iterator[str]:
+    """
+    Split long text into chunks for API processing, one chunk at a time
     
-    @staticmethod
-    @lru_cache(maxsize=100)  # Cache results for efficiency
-    def extract_date_from_filename(file_name: str) -> str:
-        """
-        Extract date from filename pattern with caching
+    Args:
+        text: Text to chunk
+        max_length: Maximum size of each chunk in UTF-8 bytes
         
-        Args:
-            file_name: Filename to extract date from
-            
-        Returns:
-            Extracted date as string in YYYY-MM-DD format or empty string if not found
-        """
-        call_date = ""
-        try:
-            # Common date patterns in filenames
-            date_patterns = [
-                r'(\d{4}[-_/]\d{1,2}[-_/]\d{1,2})',  # YYYY-MM-DD, YYYY/MM/DD, YYYY_MM_DD
-                r'(\d{1,2}[-_/]\d{1,2}[-_/]\d{4})',  # MM-DD-YYYY, MM/DD/YYYY, MM_DD_YYYY
-                r'(\d{8})'  # YYYYMMDD
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, file_name)
-                if match:
-                    date_str = match.group(1)
-                    # Convert YYYYMMDD to YYYY-MM-DD
-                    if len(date_str) == 8 and date_str.isdigit():
-                        call_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
-                    else:
-                        call_date = date_str
-                    break
+    Yields:
+        Text chunks
+    """
+    if not text:
+        return
+    
+    # API payload limits count bytes; ASCII text has one byte per character and needs no encoding
+    data = text if text.isascii() else text.encode('utf-8')
+    if len(data) <= max_length:
+        yield text
+        return
+    
+    for start, end in _chunk_spans(data, max_length):
+        # Offsets fall on ASCII punctuation and whitespace, so byte slices decode cleanly
+        yield data[start:end] if data is text else data[start:end].decode('utf-8')
+
+def chunk_text(text: str, max_length: int = 8000) -> List[str]:
+    """
+    Split long text into chunks for API processing
+    
+    Args:
+        text: Text to chunk
+        max_length: Maximum size of each chunk in UTF-8 bytes
         
-        except Exception as e:
-            logger.error(f"Error extracting date from filename {file_name}: {str(e)}")
+    Returns:
+        List of text chunks
+    """
+    if not text or len(text) > _CHUNK_CACHE_MAX_TEXT or (text.isascii() and len(text) <= max_length):
+        return list(iter_chunks(text, max_length))
+    return list(_split_to_chunks(text, max_length))
+
+@lru_cache(maxsize=256)  # The same transcript is often chunked again on retries
+def _split_to_chunks(text: str, max_length: int) -> Tuple[str, ...]:
+    """
+    Split text into chunks, caching the result
+    
+    Args:
+        text: Text to chunk
+        max_length: Maximum size of each chunk in UTF-8 bytes
+        
+    Returns:
+        Tuple of text chunks, immutable so cached results cannot be changed by callers
+    """
+    return tuple(iter_chunks(text, max_length))
+
+@cache  # Filenames repeat across a batch, so an unbounded dict cache is cheapest
+def extract_date_from_filename(file_name: str) -> str:
+    """
+    Extract date from filename pattern with caching
+    
+    Args:
+        file_name: Filename to extract date from
+        
+    Returns:
+        Extracted date as string in YYYY-MM-DD format or empty string if not found
+    """
+    # Missing filenames (e.g. NaN from a CSV) have no date
+    if not isinstance(file_name, str):
+        return ""
+    
+    match = _DATE_RE.search(file_name)
+    if not match:
+        return ""
+    
+    date_str = match.group(match.lastgroup)
+    # Convert YYYYMMDD to YYYY-MM-DD
+    if match.lastgroup == 'ymd8':
+        date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+    
+    # Many files share a call date, so share one string object per date
+    return sys.intern(date_str)
+
+def extract_dates(file_names: Iterable[str]) -> List[str]:
+    """
+    Extract dates from a batch of filenames
+    
+    Args:
+        file_names: Filenames to extract dates from
         
-        return call_date
+    Returns:
+        Extracted dates in the same order, each as in extract_date_from_filename
+    """
+    return [extract_date_from_filename(file_name) for file_name in file_names]
+
+def clean_text(text: str) -> str:
+    """
+    Clean and normalize text
     
-    @staticmethod
-    def clean_text(text: str) -> str:
-        """
-        Clean and normalize text
+    Args:
+        text: Text to clean
         
-        Args:
-            text: Text to clean
-            
-        Returns:
-            Cleaned text
-        """
-        if not text:
-            return ""
-            
-        # Replace multiple spaces with a single space
-        text = re.sub(r'\s+', ' ', text)
+    Returns:
+        Cleaned text
+    """
+    if not text:
+        return ""
         
-        # Remove leading/trailing whitespace
-        text = text.strip()
+    # Collapse whitespace runs to a single space; split() also drops leading/trailing whitespace
+    return ' '.join(text.split())
+
+def extract_phone_number(text: str) -> Optional[str]:
+    """
+    Extract phone number from text
+    
+    Args:
+        text: Text to extract phone number from
         
-        return text
+    Returns:
+        Phone number or None if not found
+    """
+    if not isinstance(text, str):
+        return None
+    
+    phone_re = _PHONE_RE
+    if _ASCII_PHONE_RE and text.isascii():
+        phone_re = _ASCII_PHONE_RE
+    
+    match = phone_re.search(text)
+    return sys.intern(match.group(0)) if match else None
+
+def get_transcription_status(record: Mapping[str, Any]) -> str:
+    """
+    Classify a transcription record as usable, empty or failed
+    
+    Records saved before transcription_status existed have no status and flag
+    failures with an "ERROR:" prefix in the transcription text instead.
     
-    @staticmethod
-    def extract_phone_number(text: str) -> Optional[str]:
-        """
-        Extract phone number from text
+    Args:
+        record: Transcription record, e.g. a dict, DAO row or DataFrame row
         
-        Args:
-            text: Text to extract phone number from
-            
-        Returns:
-            Phone number or None if not found
-        """
-        try:
-            # Look for patterns like +91XXXXXXXXXX or 0XXXXXXXXXX
-            patterns = [
-                r'\+\d{12}',  # +91XXXXXXXXXX
-                r'\+\d{2}\s?\d{10}',  # +91 XXXXXXXXXX
-                r'\d{10}',  # XXXXXXXXXX (10 digits)
-                r'\d{3}[-\s]?\d{3}[-\s]?\d{4}'  # XXX-XXX-XXXX or XXX XXX XXXX
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, text)
-                if match:
-                    return match.group(0)
-                    
-            return None
-        except Exception as e:
-            logger.error(f"Error extracting phone number: {str(e)}")
-            return None 
\ No newline at end of file
+    Returns:
+        "ok", "empty" or "error"
+    """
+    status = record.get("transcription_status")
+    if status == "error":
+        return "error"
+    
+    transcription = record.get("transcription")
+    if not isinstance(transcription, str) or not transcription.strip():
+        return "empty"
+    if not isinstance(status, str) and transcription.startswith("ERROR:"):
+        return "error"
+    return "ok"
+
+class TextProcessor:
+    """Utilities for processing text data"""
+    
+    # Kept for existing callers; the module-level functions can be imported directly
+    chunk_text = staticmethod(chunk_text)
+    iter_chunks = staticmethod(iter_chunks)
+    extract_date_from_filename = staticmethod(extract_date_from_filename)
+    extract_dates = staticmethod(extract_dates)
+    clean_text = staticmethod(clean_text)
+    extract_phone_number = staticmethod(extract_phone_number)